@@ -0,0 +1,63 @@
+"""Time the common TaskStore operations on a synthetic task list.
+
+Run "python benchmarks/bench_store.py [COUNT]" from the repository root
+(COUNT defaults to 100000). Every task shares one name, the worst case
+for sorting by name.
+"""
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from task_store import TaskStore, due_bounds  # noqa: E402
+
+
+def make_tasks(count):
+    random.seed(1)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            'id': number,
+            'name': "Weekly review",
+            'due_date': (start + timedelta(minutes=random.randrange(525600))).strftime("%Y-%m-%d %H:%M"),
+            'category': random.choice(["Work", "Personal", "Shopping", "Health", "Other"]),
+            'priority': random.choice(["Low", "Normal", "Medium", "High", "Urgent"]),
+            'status': random.choice(["Pending", "Completed", "Completed"]),
+            'notes': f"ticket {number}",
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<28} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def main(count):
+    tasks = make_tasks(count)
+    store = TaskStore()
+    timed(f"load {count} tasks", lambda: store.load(tasks))
+    timed("facets (first filter)", lambda: store.matching(status="Pending", category="Work"))
+    timed("facets (cached)", lambda: store.matching(status="Pending", category="Work"))
+    week = due_bounds("This Week", datetime(2024, 6, 1).date())
+    timed("due index (first range)", lambda: store.due_ids_between(*week))
+    timed("due index (cached)", lambda: store.due_ids_between(*week))
+    ids = list(store.matching())
+    columns = [('name', False), ('due', False)]
+    timed("sort by name, due", lambda: store.sort_ids(ids, columns))
+    timed("sort (cached)", lambda: store.sort_ids(ids, columns))
+    timed("sort (direction toggle)", lambda: store.sort_ids(ids, [('name', True), ('due', False)]))
+    timed("search index build", store.build_search)
+    timed("search 'weekly rev'", lambda: store.search("weekly rev"))
+    timed("update one task", lambda: store.update(ids[0], {'status': 'Completed'}))
+    timed("sort after the update", lambda: store.sort_ids(ids, columns))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1 @@
+"""pytest configuration: makes the top-level task_* modules importable from tests/."""
@@ -0,0 +1,135 @@
+"""Background delivery of desktop notifications and reminder sounds.
+
+plyer notifications and sound playback can block for hundreds of
+milliseconds (or hang outright), so AlertDispatcher runs them on worker
+threads instead of inside Tk callbacks. Alerts are queued in a bounded
+queue; when it is full, or a kind of alert exceeds its rate limit, new
+alerts are dropped rather than piling up. A delivery that takes longer
+than its timeout is abandoned so the worker can move on. Every outcome
+is counted and put on the results queue as (kind, seconds, error) for
+the caller to collect on its own thread.
+"""
+import queue
+import threading
+import time
+from collections import deque
+
+
+class AlertTimeout(Exception):
+    """An alert did not finish within the dispatcher's timeout"""
+
+
+class AlertDispatcher:
+    """Bounded queue of alerts delivered by worker threads
+
+    rate_limits maps an alert kind to (count, seconds): at most count
+    alerts of that kind are accepted in any window of seconds.
+    """
+
+    COUNTERS = ('delivered', 'failed', 'timed_out', 'dropped', 'rate_limited')
+
+    def __init__(self, workers=1, max_pending=16, timeout=10, rate_limits=None):
+        self.timeout = timeout
+        self.rate_limits = dict(rate_limits or {})
+        self.results = queue.Queue()
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._sent = {}  # kind -> deque of accept times, for rate limiting
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._active = 0  # Alerts accepted but not finished yet
+        self._threads = []
+        for number in range(workers):
+            thread = threading.Thread(target=self._run, name=f"alerts-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _count(self, kind, counter):
+        with self._lock:
+            counts = self._counters.setdefault(kind, dict.fromkeys(self.COUNTERS, 0))
+            counts[counter] += 1
+
+    def counters(self, kind):
+        """Return a copy of the outcome counters for a kind of alert"""
+        with self._lock:
+            return dict(self._counters.get(kind, dict.fromkeys(self.COUNTERS, 0)))
+
+    def _allow(self, kind, now):
+        limit = self.rate_limits.get(kind)
+        if limit is None:
+            return True
+        count, seconds = limit
+        sent = self._sent.setdefault(kind, deque())
+        while sent and sent[0] <= now - seconds:
+            sent.popleft()
+        if len(sent) >= count:
+            return False
+        sent.append(now)
+        return True
+
+    def submit(self, kind, func, *args, **kwargs):
+        """Queue func(*args, **kwargs) for delivery; False if it was dropped"""
+        if not self._threads:
+            return False
+        if not self._allow(kind, time.monotonic()):
+            self._count(kind, 'rate_limited')
+            return False
+        with self._lock:
+            self._active += 1
+        try:
+            self._jobs.put_nowait((kind, func, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                self._active -= 1
+            self._count(kind, 'dropped')
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            self._deliver(*job)
+
+    def _deliver(self, kind, func, args, kwargs):
+        outcome = {}
+
+        def call():
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                outcome['error'] = e
+
+        start = time.perf_counter()
+        # The call runs on its own thread so a hung backend can be abandoned
+        thread = threading.Thread(target=call, daemon=True)
+        thread.start()
+        thread.join(self.timeout)
+        seconds = time.perf_counter() - start
+
+        if thread.is_alive():
+            error = AlertTimeout(f"{kind} alert took longer than {self.timeout} s")
+            self._count(kind, 'timed_out')
+        else:
+            error = outcome.get('error')
+            self._count(kind, 'failed' if error else 'delivered')
+        self.results.put((kind, seconds, error))
+        with self._lock:
+            self._active -= 1
+
+    def busy(self):
+        """True while accepted alerts are queued or being delivered"""
+        with self._lock:
+            return self._active > 0
+
+    def close(self, timeout=2):
+        """Stop the workers, waiting briefly for queued alerts"""
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            try:
+                self._jobs.put(None, timeout=timeout)
+            except queue.Full:
+                break
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(max(0, deadline - time.monotonic()))
@@ -0,0 +1,76 @@
+"""Reminder sounds, loaded on first use.
+
+SoundPlayer does nothing at construction: pygame is imported and its mixer
+initialized only when a sound is first played or preloaded, so startup
+pays nothing when sounds are disabled. Each configured sound file is
+decoded once into a cached pygame Sound; playing a Sound picks a free
+mixer channel, so short alerts can overlap instead of restarting one
+shared music stream.
+"""
+import os
+import threading
+
+
+MIXER_CHANNELS = 8  # Alerts that can play at the same time
+
+
+class SoundPlayer:
+    """Lazily initialized mixer with a cache of decoded sounds"""
+
+    def __init__(self, sounds):
+        self.sounds = dict(sounds)  # name -> sound file path
+        self._pygame = None
+        self._unavailable = None  # Why the mixer could not start, once it failed
+        self._cache = {}  # name -> pygame Sound
+        self._lock = threading.Lock()
+
+    def _mixer(self):
+        """Return the pygame module with its mixer ready, or None"""
+        if self._pygame is None and self._unavailable is None:
+            try:
+                import pygame
+                pygame.mixer.init()
+                pygame.mixer.set_num_channels(MIXER_CHANNELS)
+            except Exception as e:
+                # Don't retry on every reminder
+                self._unavailable = e
+                print(f"DEBUG: Sound unavailable: {e}")
+            else:
+                self._pygame = pygame
+        return self._pygame
+
+    def _sound(self, name):
+        sound = self._cache.get(name)
+        if sound is None:
+            pygame = self._mixer()
+            path = self.sounds.get(name)
+            if pygame is None or not path or not os.path.exists(path):
+                return None
+            sound = self._cache[name] = pygame.mixer.Sound(path)
+        return sound
+
+    def preload(self):
+        """Start the mixer and decode every configured sound"""
+        with self._lock:
+            for name in self.sounds:
+                try:
+                    self._sound(name)
+                except Exception as e:
+                    print(f"DEBUG: Could not load sound '{name}': {e}")
+
+    def play(self, name):
+        """Play a configured sound; returns False if it is not available"""
+        with self._lock:
+            sound = self._sound(name)
+            if sound is None:
+                return False
+            sound.play()
+            return True
+
+    def close(self):
+        """Shut the mixer down if it was started"""
+        with self._lock:
+            self._cache = {}
+            if self._pygame is not None:
+                self._pygame.mixer.quit()
+                self._pygame = None
@@ -0,0 +1,215 @@
+"""Incremental, deduplicated task backups.
+
+Each backup is one gzip-compressed JSON manifest in backups/incremental:
+
+    {
+        "created": "2024-01-01T09:00:00",
+        "parent": "<name of the previous backup>" or null,
+        "tasks": {"<task id>": "<sha256 of the task>", ...},
+        "removed": [<task id>, ...],
+        "objects": {"<sha256>": {task dict}, ...}
+    }
+
+A backup with no parent is a full backup listing every task. Every other
+backup only lists tasks whose content hash changed since its parent, and
+only stores objects that are not already in the chain. Restoring replays
+the chain from the nearest full backup.
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+
+
+DEFAULT_RETENTION = {'hourly': 24, 'daily': 7, 'weekly': 4}
+
+
+def task_hash(task):
+    """Content hash of a task, independent of key order"""
+    payload = json.dumps(task, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class BackupManager:
+    """Creates, restores and thins incremental backups"""
+
+    SUFFIX = '.json.gz'
+
+    def __init__(self, directory=os.path.join('backups', 'incremental'),
+                 full_every=24):
+        self.directory = directory
+        self.full_every = full_every  # Longest chain before a new full backup
+        self._last = None  # Replay state of the newest backup, see _state
+
+    def list_backups(self):
+        """Return backup names, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[:-len(self.SUFFIX)] for name in os.listdir(self.directory)
+            if name.endswith(self.SUFFIX)
+        )
+
+    def _path(self, name):
+        return os.path.join(self.directory, name + self.SUFFIX)
+
+    def _read(self, name):
+        with gzip.open(self._path(name), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write(self, name, manifest):
+        path = self._path(name)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _chain(self, name):
+        """Manifests from the nearest full backup up to name, oldest first"""
+        chain = []
+        while name is not None:
+            manifest = self._read(name)
+            chain.append(manifest)
+            name = manifest['parent']
+        chain.reverse()
+        return chain
+
+    @staticmethod
+    def _replay(chain):
+        """Return ({task id: hash}, {hash: task}) for the end of a chain"""
+        hashes = {}
+        objects = {}
+        for manifest in chain:
+            objects.update(manifest['objects'])
+            for task_id in manifest['removed']:
+                hashes.pop(str(task_id), None)
+            hashes.update(manifest['tasks'])
+        return hashes, objects
+
+    def _state(self, name):
+        """Return the cached replay state for the backup called name"""
+        if self._last is None or self._last['name'] != name:
+            # Cached state is stale (first run, or backups changed on disk)
+            chain = self._chain(name)
+            hashes, objects = self._replay(chain)
+            self._last = {
+                'name': name,
+                'hashes': hashes,
+                'known': set(objects),
+                'depth': len(chain),
+            }
+        return self._last
+
+    def create(self, tasks, now=None):
+        """Back up the given tasks and return the new backup's name"""
+        now = now or datetime.now()
+        os.makedirs(self.directory, exist_ok=True)
+
+        existing = self.list_backups()
+        parent = existing[-1] if existing else None
+        state = {'hashes': {}, 'known': set(), 'depth': 0}
+        if parent is not None:
+            state = self._state(parent)
+            # Start a new full backup once the chain gets long
+            if state['depth'] >= self.full_every:
+                parent = None
+                state = {'hashes': {}, 'known': set(), 'depth': 0}
+
+        previous = state['hashes']
+        current = {}
+        changed = {}
+        objects = {}
+        for task in tasks:
+            task_id = str(task['id'])
+            digest = task_hash(task)
+            current[task_id] = digest
+            if previous.get(task_id) != digest:
+                changed[task_id] = digest
+                if digest not in state['known']:
+                    objects[digest] = task
+
+        manifest = {
+            'created': now.isoformat(timespec='seconds'),
+            'parent': parent,
+            'tasks': changed,
+            'removed': [int(task_id) for task_id in previous if task_id not in current],
+            'objects': objects,
+        }
+        name = now.strftime("%Y%m%d_%H%M%S_%f")
+        self._write(name, manifest)
+        self._last = {
+            'name': name,
+            'hashes': current,
+            'known': state['known'] | set(objects),
+            'depth': state['depth'] + 1,
+        }
+        return name
+
+    def restore(self, name):
+        """Rebuild the task list as it was at the given backup"""
+        hashes, objects = self._replay(self._chain(name))
+        tasks = [objects[digest] for digest in hashes.values()]
+        tasks.sort(key=lambda task: task['id'])
+        return tasks
+
+    def thin(self, retention=None, now=None):
+        """Delete backups not kept by the retention policy, return their names
+
+        The newest backup in each of the last N hours, days and weeks is kept,
+        as is the newest backup overall. Deleted backups are folded into their
+        child so every remaining backup can still be restored.
+        """
+        retention = retention or DEFAULT_RETENTION
+        now = now or datetime.now()
+        names = self.list_backups()
+        if not names:
+            return []
+
+        keep = {names[-1]}
+        periods = (
+            ('hourly', timedelta(hours=1)),
+            ('daily', timedelta(days=1)),
+            ('weekly', timedelta(weeks=1)),
+        )
+        for key, length in periods:
+            seen = set()
+            for name in reversed(names):
+                created = datetime.strptime(name, "%Y%m%d_%H%M%S_%f")
+                bucket = int((now - created) / length)
+                if bucket < int(retention.get(key, 0)) and bucket not in seen:
+                    seen.add(bucket)
+                    keep.add(name)
+
+        deleted = []
+        for index, name in enumerate(names):
+            if name in keep:
+                continue
+            child = names[index + 1]  # The newest backup is always kept
+            self._fold_into_child(name, child)
+            os.remove(self._path(name))
+            deleted.append(name)
+        self._last = None
+        return deleted
+
+    def _fold_into_child(self, name, child_name):
+        manifest = self._read(name)
+        child = self._read(child_name)
+        if child['parent'] != name:
+            # child starts a new full chain and does not depend on this one
+            return
+
+        tasks = {
+            task_id: digest for task_id, digest in manifest['tasks'].items()
+            if int(task_id) not in child['removed']
+        }
+        tasks.update(child['tasks'])
+        removed = [task_id for task_id in manifest['removed'] if str(task_id) not in tasks]
+        removed += child['removed']
+
+        child['parent'] = manifest['parent']
+        child['tasks'] = tasks
+        # A full backup lists every task, so removals are already applied
+        child['removed'] = removed if child['parent'] is not None else []
+        child['objects'] = dict(manifest['objects'], **child['objects'])
+        self._write(child_name, child)
@@ -0,0 +1,365 @@
+"""Streaming task import and export for JSON arrays, NDJSON and CSV files.
+
+Files are parsed incrementally so memory stays proportional to the number
+of valid tasks rather than the file size. Large NDJSON files are split at
+line boundaries and parsed in a process pool. Exports write one task at a
+time. Pool worker processes import this module, so it must stay free of
+Tk and the rest of the GUI.
+"""
+import codecs
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from task_backup import task_hash
+from task_store import parse_due
+
+
+CSV_FIELDS = [
+    'id', 'name', 'due_date', 'status', 'category', 'priority', 'notes',
+    'reminder_enabled', 'reminder_time', 'custom_reminder', 'next_reminder',
+]
+CHUNK_SIZE = 1 << 20  # Bytes read per step while streaming
+PARALLEL_MIN_BYTES = 64 << 20  # NDJSON files above this use a process pool
+BATCH_SIZE = 5000  # Validated tasks handed back per batch
+
+TASK_DEFAULTS = {
+    'status': 'Pending',
+    'category': 'Other',
+    'priority': 'Normal',
+    'notes': '',
+    'reminder_enabled': False,
+    'reminder_time': '15 min',
+}
+
+
+def detect_format(path):
+    """Guess 'json', 'ndjson' or 'csv' from the extension and first byte"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    if extension == '.csv':
+        return 'csv'
+    with open(path, 'rb') as f:
+        head = f.read(4096).lstrip(codecs.BOM_UTF8).lstrip()
+    return 'ndjson' if head.startswith(b'{') else 'json'
+
+
+def content_hash(task):
+    """Hash of a task's content, ignoring its id"""
+    return task_hash({k: v for k, v in task.items() if k != 'id'})
+
+
+def normalize_task(record):
+    """Validate one imported record and return it as a task dict
+
+    Raises ValueError describing the problem for invalid records.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("expected an object")
+    name = record.get('name')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("missing task name")
+    due_date = record.get('due_date')
+    if parse_due(due_date) is None:
+        raise ValueError(f"invalid due date {due_date!r}")
+
+    task = dict(TASK_DEFAULTS)
+    task.update({k: v for k, v in record.items() if v is not None})
+
+    task_id = task.get('id')
+    if isinstance(task_id, str) and task_id.strip().isdigit():
+        task['id'] = int(task_id)
+    elif not isinstance(task_id, int) or isinstance(task_id, bool):
+        task.pop('id', None)
+    return task
+
+
+def _from_csv_row(row):
+    """Convert CSV string values back to the types tasks use"""
+    record = {k: v for k, v in row.items() if k is not None and v != ''}
+    if 'reminder_enabled' in record:
+        record['reminder_enabled'] = record['reminder_enabled'].strip().lower() in ('1', 'true', 'yes')
+    if 'custom_reminder' in record:
+        record['custom_reminder'] = json.loads(record['custom_reminder'])
+    return record
+
+
+def _element_end(buf, pos):
+    """Index of the ',' or ']' ending the array element at pos, or -1
+
+    Brackets and strings are tracked so separators inside the element are
+    skipped; -1 means the element continues past the end of buf.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(pos, len(buf)):
+        char = buf[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            if depth > 0:
+                depth -= 1
+            elif char == ']':
+                # End of the array itself
+                return index
+        elif char == ',' and depth == 0:
+            return index
+    return -1
+
+
+def _iter_json_array(f, progress):
+    """Yield (location, value) for each element of a top-level JSON array
+
+    A malformed element is yielded as a ValueError and skipped up to the
+    next top-level separator, so the rest of the array is still read.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buf = ''
+    pos = 0
+    eof = False
+    started = False
+    index = 0
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(CHUNK_SIZE)
+        progress(len(chunk))
+        eof = not chunk
+        buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+
+    while True:
+        # Skip whitespace and separators between values
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("unexpected end of file in JSON array")
+            fill()
+            continue
+
+        if not started:
+            if buf[pos] != '[':
+                raise ValueError("expected a JSON array of tasks")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == ']':
+            return
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except ValueError as e:
+            boundary = _element_end(buf, pos)
+            if boundary < 0:
+                if eof:
+                    raise
+                # The value continues in the next chunk
+                fill()
+                continue
+            # The element is complete but malformed; resume after it
+            yield f"item {index}", e
+            index += 1
+            pos = boundary
+            continue
+        yield f"item {index}", value
+        index += 1
+        pos = end
+
+
+def _iter_ndjson(f, progress):
+    for line_number, line in enumerate(f, 1):
+        progress(len(line))
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = e
+            yield f"line {line_number}", record
+
+
+def _iter_csv(f, progress):
+    text = codecs.getreader('utf-8-sig')(f)
+
+    def lines():
+        for line in text:
+            progress(len(line.encode('utf-8')))
+            yield line
+
+    reader = csv.DictReader(lines())
+    for row in reader:
+        try:
+            record = _from_csv_row(row)
+        except ValueError as e:
+            record = e
+        yield f"line {reader.line_num}", record
+
+
+def _parse_ndjson_range(path, start, end):
+    """Pool worker: parse and validate the NDJSON lines starting in [start, end)"""
+    tasks = []
+    errors = []
+    with open(path, 'rb') as f:
+        if start:
+            # Skip the line that started before our range
+            f.seek(start - 1)
+            f.readline()
+        position = f.tell()
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            offset = position
+            position += len(line)
+            if not line.strip():
+                continue
+            try:
+                task = normalize_task(json.loads(line))
+            except ValueError as e:
+                errors.append((f"byte {offset}", str(e)))
+                continue
+            tasks.append((task, content_hash(task)))
+    return tasks, errors, end - start
+
+
+def _parallel_ndjson(path, size, progress):
+    """Yield (tasks, errors) batches from a large NDJSON file using a pool"""
+    workers = os.cpu_count() or 2
+    step = max(CHUNK_SIZE * 8, size // (workers * 4) + 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_parse_ndjson_range, path, start, min(start + step, size))
+            for start in range(0, size, step)
+        ]
+        # Gather in file order so the import keeps the file's task order
+        results = {}
+        for future in as_completed(futures):
+            tasks, errors, parsed = future.result()
+            results[future] = (tasks, errors)
+            progress(parsed)
+        for future in futures:
+            yield results.pop(future)
+
+
+def _sequential(path, fmt, progress):
+    """Yield (tasks, errors) batches by streaming the file in this process"""
+    readers = {'json': _iter_json_array, 'ndjson': _iter_ndjson, 'csv': _iter_csv}
+    tasks = []
+    errors = []
+    with open(path, 'rb') as f:
+        for where, record in readers[fmt](f, progress):
+            if isinstance(record, ValueError):
+                # Readers pass on records they could not decode
+                errors.append((where, f"invalid data: {record}"))
+                continue
+            try:
+                task = normalize_task(record)
+            except ValueError as e:
+                errors.append((where, str(e)))
+                continue
+            tasks.append((task, content_hash(task)))
+            if len(tasks) >= BATCH_SIZE:
+                yield tasks, errors
+                tasks, errors = [], []
+    yield tasks, errors
+
+
+def load_import(path, existing_tasks, fmt=None, progress=None):
+    """Read tasks from path and drop ones that are already present
+
+    existing_tasks is a snapshot of the current tasks. A record is a
+    duplicate when its content, ignoring the id, matches an existing or
+    earlier imported task. progress, if given, is called as
+    progress(done_bytes, total_bytes) from this thread.
+    Returns a dict with 'tasks' (new tasks, ids kept where given so that
+    TaskStore.add_many remaps the ones already taken), 'duplicates'
+    (count) and 'errors' (list of (location, message)).
+    """
+    fmt = fmt or detect_format(path)
+    size = os.path.getsize(path)
+    done = 0
+
+    def advance(count):
+        nonlocal done
+        done += count
+        if progress:
+            progress(min(done, size), size)
+
+    seen_hashes = {content_hash(task) for task in existing_tasks}
+    result = {'tasks': [], 'duplicates': 0, 'errors': []}
+
+    if fmt == 'ndjson' and size >= PARALLEL_MIN_BYTES:
+        batches = _parallel_ndjson(path, size, advance)
+    else:
+        batches = _sequential(path, fmt, advance)
+
+    for tasks, errors in batches:
+        result['errors'].extend(errors)
+        for task, digest in tasks:
+            if digest in seen_hashes:
+                result['duplicates'] += 1
+                continue
+            seen_hashes.add(digest)
+            result['tasks'].append(task)
+    return result
+
+
+def _to_csv_row(task):
+    """Flatten a task into CSV string values, the inverse of _from_csv_row"""
+    row = {field: task.get(field, '') for field in CSV_FIELDS}
+    if 'custom_reminder' in task:
+        row['custom_reminder'] = json.dumps(task['custom_reminder'])
+    return row
+
+
+def export_tasks(path, tasks, fmt=None, progress=None):
+    """Write tasks to path as 'json' (compact), 'ndjson' or 'csv'
+
+    Tasks are written one at a time to a temporary file that replaces path
+    when complete. progress, if given, is called as progress(done, total).
+    Returns the number of tasks written.
+    """
+    if fmt is None:
+        extension = os.path.splitext(path)[1].lower()
+        fmt = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv'}.get(extension, 'json')
+    total = len(tasks)
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+        elif fmt == 'json':
+            f.write('[')
+
+        for count, task in enumerate(tasks, 1):
+            if fmt == 'csv':
+                writer.writerow(_to_csv_row(task))
+            elif fmt == 'ndjson':
+                f.write(json.dumps(task, separators=(',', ':')) + '\n')
+            else:
+                if count > 1:
+                    f.write(',\n')
+                f.write(json.dumps(task, separators=(',', ':')))
+            if progress and count % BATCH_SIZE == 0:
+                progress(count, total)
+
+        if fmt == 'json':
+            f.write(']\n')
+
+    os.replace(tmp_path, path)
+    if progress:
+        progress(total, total)
+    return total
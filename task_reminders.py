@@ -0,0 +1,141 @@
+"""Reminder scheduling for Task Reminder.
+
+ReminderSchedule keeps every upcoming reminder of every pending task in a
+min-heap of (fire_time, task_id, reminder_id), so the GUI only needs one
+timer set for the earliest entry. Reminders come from:
+
+    due          the task's due_date
+    before       due_date minus the reminder_time offset ("15 min", ...)
+    custom:<n>   each entry of custom_reminder['times']
+    snooze       next_reminder, written when a reminder is snoozed
+
+Entries are replaced as tasks change; outdated heap entries are skipped
+when they reach the top.
+"""
+import heapq
+from datetime import timedelta
+
+from task_store import parse_due
+
+
+# reminder_time choices offered in the details panel
+REMINDER_OFFSETS = {
+    '5 min': timedelta(minutes=5),
+    '15 min': timedelta(minutes=15),
+    '30 min': timedelta(minutes=30),
+    '1 hour': timedelta(hours=1),
+    '1 day': timedelta(days=1),
+}
+
+# Task fields that affect when a task's reminders fire
+REMINDER_FIELDS = {
+    'due_date', 'status', 'reminder_enabled', 'reminder_time',
+    'custom_reminder', 'next_reminder',
+}
+
+
+def reminder_times(task):
+    """Return {reminder_id: fire datetime} for a task's reminders"""
+    if task.get('status', 'Pending') == 'Completed':
+        return {}
+    times = {}
+    due = parse_due(task.get('due_date'))
+    if due is not None:
+        times['due'] = due
+
+    if task.get('reminder_enabled'):
+        reminder_time = task.get('reminder_time')
+        if reminder_time == 'custom':
+            custom = task.get('custom_reminder') or {}
+            for index, value in enumerate(custom.get('times', [])):
+                fire_time = parse_due(value)
+                if fire_time is not None:
+                    times[f'custom:{index}'] = fire_time
+        elif due is not None and reminder_time in REMINDER_OFFSETS:
+            times['before'] = due - REMINDER_OFFSETS[reminder_time]
+
+    snooze = parse_due(task.get('next_reminder'))
+    if snooze is not None:
+        times['snooze'] = snooze
+    return times
+
+
+class ReminderSchedule:
+    """Min-heap of upcoming reminders, updated one task at a time"""
+
+    def __init__(self):
+        self._heap = []  # (fire_time, task_id, reminder_id), may hold stale entries
+        self._entries = {}  # task id -> {reminder_id: fire_time}, the live reminders
+        self._fired = set()  # Heap entries already delivered
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def rebuild(self, tasks):
+        """Schedule the reminders of tasks, replacing everything"""
+        self._entries = {}
+        self._heap = []
+        for task in tasks:
+            times = reminder_times(task)
+            if times:
+                self._entries[task['id']] = times
+                self._heap.extend(
+                    (fire_time, task['id'], reminder_id)
+                    for reminder_id, fire_time in times.items()
+                )
+        heapq.heapify(self._heap)
+
+    def update(self, task):
+        """Reschedule one task's reminders after it was added or edited"""
+        times = reminder_times(task)
+        previous = self._entries.get(task['id'], {})
+        if times == previous:
+            return False
+        if times:
+            self._entries[task['id']] = times
+            # Entries whose time did not change are already in the heap
+            for reminder_id, fire_time in times.items():
+                if previous.get(reminder_id) != fire_time:
+                    heapq.heappush(self._heap, (fire_time, task['id'], reminder_id))
+        else:
+            self._entries.pop(task['id'], None)
+        return True
+
+    def remove(self, task_id):
+        """Forget a deleted task's reminders"""
+        return self._entries.pop(task_id, None) is not None
+
+    def on_change(self, action, task, fields=None):
+        """TaskStore listener; returns True if the schedule changed"""
+        if action == 'removed':
+            return self.remove(task['id'])
+        if fields is not None and not fields & REMINDER_FIELDS:
+            return False
+        return self.update(task)
+
+    def _live(self, entry):
+        fire_time, task_id, reminder_id = entry
+        return (self._entries.get(task_id, {}).get(reminder_id) == fire_time
+                and entry not in self._fired)
+
+    def next_time(self):
+        """Return the earliest pending fire time, or None"""
+        heap = self._heap
+        while heap and not self._live(heap[0]):
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now):
+        """Return [(task_id, reminder_id)] due at or before now, oldest first
+
+        Each reminder is returned once; it fires again only if its time
+        changes (e.g. a new snooze).
+        """
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._live(entry):
+                self._fired.add(entry)
+                due.append((entry[1], entry[2]))
+        return due
@@ -0,0 +1,166 @@
+"""Full-text search over task names, categories and notes.
+
+SearchIndex is an inverted index from lower-cased word tokens to the
+tasks containing them, plus a sorted vocabulary so that every query word
+is matched as a prefix (search-as-you-type). It is maintained
+incrementally by TaskStore.
+"""
+import re
+from bisect import bisect_left, insort
+
+
+# Field -> weight of a token found in it; name matches rank highest
+SEARCH_FIELDS = {'name': 3, 'category': 2, 'notes': 1}
+EXACT_BONUS = 1  # Added per query word that matches a whole token
+NARROW_FRACTION = 0.25  # narrow() searches afresh above this share of the index
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Return the lower-cased word tokens of text"""
+    if not isinstance(text, str):
+        return []
+    return _TOKEN.findall(text.lower())
+
+
+def highlight(text, query, mark="«{}»"):
+    """Wrap every word of text that starts with a query word in mark"""
+    terms = tokenize(query)
+    if not terms or not isinstance(text, str):
+        return text
+
+    def replace(match):
+        word = match.group(0)
+        if word.lower().startswith(tuple(terms)):
+            return mark.format(word)
+        return word
+    return _TOKEN.sub(replace, text)
+
+
+class SearchIndex:
+    """Inverted token index with prefix lookup and ranked results"""
+
+    def __init__(self):
+        self._postings = {}  # token -> {task id: weight}
+        self._documents = {}  # task id -> {token: weight}, for removal
+        self._vocabulary = []  # Sorted tokens, for prefix ranges
+
+    def __len__(self):
+        return len(self._documents)
+
+    @staticmethod
+    def _weights(task):
+        weights = {}
+        for field, weight in SEARCH_FIELDS.items():
+            for token in tokenize(task.get(field)):
+                weights[token] = weights.get(token, 0) + weight
+        return weights
+
+    def build(self, tasks):
+        """Replace the index contents with the given tasks
+
+        Much faster than add() per task for a whole store: the vocabulary
+        is sorted once at the end instead of kept sorted token by token.
+        """
+        postings = {}
+        documents = {}
+        for task in tasks:
+            weights = self._weights(task)
+            for token, weight in weights.items():
+                postings.setdefault(token, {})[task['id']] = weight
+            documents[task['id']] = weights
+        self._postings = postings
+        self._documents = documents
+        self._vocabulary = sorted(postings)
+
+    def add(self, task):
+        """Index a task, replacing any earlier version of it"""
+        task_id = task['id']
+        self.remove(task_id)
+        weights = self._weights(task)
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[task_id] = weight
+        self._documents[task_id] = weights
+
+    def remove(self, task_id):
+        """Drop a task from the index"""
+        weights = self._documents.pop(task_id, None)
+        if not weights:
+            return
+        for token in weights:
+            postings = self._postings[token]
+            del postings[task_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _prefix_tokens(self, prefix):
+        vocabulary = self._vocabulary
+        position = bisect_left(vocabulary, prefix)
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            yield vocabulary[position]
+            position += 1
+
+    def search(self, query, candidates=None):
+        """Return ids of tasks matching every word of query, best first
+
+        Each query word matches tokens it is a prefix of. A task's score is
+        the summed field weights of its matching tokens, plus EXACT_BONUS
+        for each whole-word match; ties keep id order. If candidates is
+        given, only those task ids are considered.
+        """
+        terms = dict.fromkeys(tokenize(query))
+        if not terms:
+            return []
+        scores = None
+        if candidates is not None:
+            # Zero scores: the first term adds its score to them
+            scores = dict.fromkeys(candidates, 0)
+        for term in terms:
+            term_scores = {}
+            for token in self._prefix_tokens(term):
+                bonus = EXACT_BONUS if token == term else 0
+                postings = self._postings[token]
+                if scores is not None and len(scores) < len(postings):
+                    # Fewer tasks left than the token has: look each one up
+                    for task_id in scores:
+                        weight = postings.get(task_id)
+                        if weight is not None:
+                            term_scores[task_id] = max(term_scores.get(task_id, 0), weight + bonus)
+                    continue
+                for task_id, weight in postings.items():
+                    if scores is None or task_id in scores:
+                        term_scores[task_id] = max(term_scores.get(task_id, 0), weight + bonus)
+            if scores is not None:
+                term_scores = {
+                    task_id: scores[task_id] + score for task_id, score in term_scores.items()
+                }
+            scores = term_scores
+            if not scores:
+                break
+        return self._ranked(scores)
+
+    def narrow(self, query, candidates):
+        """Like search(), but only considering the task ids in candidates
+
+        When query extends an earlier query, its matches are a subset of
+        the earlier matches, so search() starts from those few ids and
+        looks them up in long posting lists instead of walking them.
+        Once the candidates are a large share of the index that no longer
+        pays off, and a fresh search is filtered instead.
+        """
+        if len(candidates) > len(self._documents) * NARROW_FRACTION:
+            candidates = set(candidates)
+            return [task_id for task_id in self.search(query) if task_id in candidates]
+        return self.search(query, candidates)
+
+    @staticmethod
+    def _ranked(scores):
+        if not scores:
+            return []
+        return sorted(scores, key=lambda task_id: (-scores[task_id], task_id))
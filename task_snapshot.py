@@ -0,0 +1,261 @@
+"""Binary, memory-mappable task snapshots.
+
+Layout (all integers little-endian, columns padded to 8 bytes):
+
+    header    magic b'TRSNAP01', count, string table offset, heap offset
+    id        int64  per task
+    due       int64  per task, minutes since 1970-01-01 00:00 (naive local
+                     time), or -1 when due_date is not "YYYY-MM-DD HH:MM"
+    rec_off   uint64 per task, offset of the task's JSON record in the heap
+    rec_len   uint32 per task
+    priority  uint16 per task, index into the string table
+    status    uint16 per task, index into the string table
+    category  uint16 per task, index into the string table
+    strings   JSON array of the distinct priority/status/category values
+    heap      compact JSON records, one per task
+
+The fixed-width columns let the store index and count every task without
+parsing any JSON; full task dicts are decoded from the heap only when a
+task is actually needed.
+
+Run "python task_snapshot.py to-json|from-json SRC DEST" to convert.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+from task_store import TaskStore
+
+
+MAGIC = b'TRSNAP01'
+HEADER = struct.Struct('<8sQQQ')
+MISSING = 0xFFFF  # String table index for a field the task does not have
+EPOCH = datetime(1970, 1, 1)
+DUE_FORMAT = "%Y-%m-%d %H:%M"
+
+# (name, array typecode, item size) in file order
+COLUMNS = (
+    ('id', 'q', 8),
+    ('due', 'q', 8),
+    ('rec_off', 'Q', 8),
+    ('rec_len', 'I', 4),
+    ('priority', 'H', 2),
+    ('status', 'H', 2),
+    ('category', 'H', 2),
+)
+STRING_COLUMNS = ('priority', 'status', 'category')
+
+
+def _padded(size):
+    return (size + 7) & ~7
+
+
+def due_minutes(due_date):
+    """Minutes since EPOCH for a canonical due date string, else -1"""
+    try:
+        due = datetime.strptime(due_date, DUE_FORMAT)
+    except (TypeError, ValueError):
+        return -1
+    # Only canonical strings can be rebuilt exactly from the column
+    if due.strftime(DUE_FORMAT) != due_date:
+        return -1
+    return (due - EPOCH) // timedelta(minutes=1)
+
+
+def minutes_to_due(minutes):
+    """Inverse of due_minutes"""
+    return (EPOCH + timedelta(minutes=minutes)).strftime(DUE_FORMAT)
+
+
+def minutes_to_datetime(minutes):
+    """Due datetime for a due column value, or None when it is -1"""
+    return EPOCH + timedelta(minutes=minutes) if minutes >= 0 else None
+
+
+def write_snapshot(path, tasks, reader=None):
+    """Write tasks to a binary snapshot at path via a temp file, see write_snapshot_file"""
+    tmp_path = f"{path}.tmp"
+    write_snapshot_file(tmp_path, tasks, reader)
+    os.replace(tmp_path, path)
+
+
+def write_snapshot_file(path, tasks, reader=None):
+    """Write tasks to a binary snapshot at path and fsync it
+
+    Items of tasks are task dicts with integer ids, or ints naming a row
+    of reader, whose record and columns are copied without decoding.
+    """
+    strings = []
+    string_index = {}
+    columns = {name: array(code) for name, code, _ in COLUMNS}
+    records = []
+    offset = 0
+
+    for task in tasks:
+        if isinstance(task, int):
+            record = reader.record(task)
+            columns['id'].append(reader.id[task])
+            columns['due'].append(reader.due[task])
+            values = [reader.string(getattr(reader, name)[task]) for name in STRING_COLUMNS]
+        else:
+            record = json.dumps(task, separators=(',', ':')).encode('utf-8')
+            columns['id'].append(task['id'])
+            columns['due'].append(due_minutes(task.get('due_date')))
+            values = [task.get(name) for name in STRING_COLUMNS]
+        records.append(record)
+        columns['rec_off'].append(offset)
+        columns['rec_len'].append(len(record))
+        offset += len(record)
+        for name, value in zip(STRING_COLUMNS, values):
+            if not isinstance(value, str):
+                columns[name].append(MISSING)
+                continue
+            if value not in string_index:
+                string_index[value] = len(strings)
+                strings.append(value)
+            columns[name].append(string_index[value])
+
+    if len(strings) >= MISSING:
+        raise ValueError("too many distinct priority/status/category values")
+
+    count = len(records)
+    string_table = json.dumps(strings).encode('utf-8')
+    strtab_offset = HEADER.size + sum(_padded(size * count) for _, _, size in COLUMNS)
+    heap_offset = strtab_offset + _padded(len(string_table))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, count, strtab_offset, heap_offset))
+        for name, _, size in COLUMNS:
+            column = columns[name]
+            if sys.byteorder == 'big':
+                column.byteswap()
+            f.write(column.tobytes())
+            f.write(b'\0' * (_padded(size * count) - size * count))
+        f.write(string_table)
+        f.write(b'\0' * (heap_offset - strtab_offset - len(string_table)))
+        for record in records:
+            f.write(record)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class SnapshotReader:
+    """Read-only, memory-mapped view of a binary snapshot
+
+    Columns are exposed as sequences indexed by row; task(row) decodes the
+    full task dict for one row from the heap.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path} is not a task snapshot")
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.count, strtab_offset, self._heap_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC or self._heap_offset > size:
+            self._map.close()
+            raise ValueError(f"{path} is not a task snapshot")
+
+        view = memoryview(self._map)
+        offset = HEADER.size
+        self._views = [view]
+        for name, code, size in COLUMNS:
+            raw = view[offset:offset + size * self.count]
+            if sys.byteorder == 'big':
+                column = array(code, raw.tobytes())
+                column.byteswap()
+            else:
+                column = raw.cast(code)
+                self._views.append(column)
+            self._views.append(raw)
+            setattr(self, name, column)
+            offset += _padded(size * self.count)
+
+        table = bytes(view[strtab_offset:self._heap_offset]).rstrip(b'\0')
+        self.strings = json.loads(table)
+
+    def string(self, index):
+        """Value for a string column entry, or None when missing"""
+        return None if index == MISSING else self.strings[index]
+
+    def fields(self, row):
+        """Indexed fields of a row as a dict, without decoding the record
+
+        Returns None when the due date could not be stored as a column and
+        the full record has to be decoded instead.
+        """
+        due = self.due[row]
+        if due < 0:
+            return None
+        fields = {'id': self.id[row], 'due_date': minutes_to_due(due)}
+        for name in STRING_COLUMNS:
+            value = self.string(getattr(self, name)[row])
+            if value is not None:
+                fields[name] = value
+        return fields
+
+    def due_datetime(self, row):
+        """Due date of a row as a datetime, or None when not columnar"""
+        return minutes_to_datetime(self.due[row])
+
+    def record(self, row):
+        """The encoded JSON record stored for a row, as bytes"""
+        start = self._heap_offset + self.rec_off[row]
+        return self._map[start:start + self.rec_len[row]]
+
+    def task(self, row):
+        """Decode the full task dict stored for a row"""
+        return json.loads(self.record(row))
+
+    def reopen(self):
+        """Return a new reader for the same file"""
+        return SnapshotReader(self.path)
+
+    def close(self):
+        """Release the memory map"""
+        if self._map is None:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        for name, _, _ in COLUMNS:
+            setattr(self, name, None)
+        self._map.close()
+        self._map = None
+
+
+def json_to_snapshot(json_path, snapshot_path):
+    """Convert a tasks.json list into a binary snapshot"""
+    with open(json_path, 'r') as f:
+        # The store gives ids to tasks that are missing one
+        tasks = TaskStore(json.load(f)).all()
+    write_snapshot(snapshot_path, tasks)
+    return len(tasks)
+
+
+def snapshot_to_json(snapshot_path, json_path):
+    """Convert a binary snapshot back into a tasks.json list"""
+    reader = SnapshotReader(snapshot_path)
+    try:
+        tasks = [reader.task(row) for row in range(reader.count)]
+    finally:
+        reader.close()
+    with open(json_path, 'w') as f:
+        json.dump(tasks, f, indent=4)
+    return len(tasks)
+
+
+if __name__ == "__main__":
+    commands = {'to-json': snapshot_to_json, 'from-json': json_to_snapshot}
+    if len(sys.argv) != 4 or sys.argv[1] not in commands:
+        print("Usage: python task_snapshot.py to-json|from-json SRC DEST")
+        sys.exit(1)
+    converted = commands[sys.argv[1]](sys.argv[2], sys.argv[3])
+    print(f"Converted {converted} tasks")
@@ -0,0 +1,692 @@
+"""Persistence backends for the task store.
+
+Every backend exposes the same small interface used by TaskReminder:
+
+    load()                  -> list of task dicts
+    record(action, task, fields)  called for every store mutation
+    save(tasks)             make the given task list durable
+    compact(tasks, force)   periodic housekeeping (snapshot rewrite)
+    close()
+
+save_needs_tasks() and needs_compact() say whether the next save(), or a
+compact() without force, will use the task list; when they return False
+the caller passes None instead of taking a full snapshot, which would
+decode every lazily loaded task.
+
+background_save says whether save() may run on BackgroundSaver's worker
+thread; backends that keep an open file or connection save inline.
+batch() is a context manager that groups many record() calls into one
+durable write.
+
+Backends that can answer filter queries themselves also provide
+query(...), see SQLiteStorage.query. Backends with lazy = True also
+provide open_snapshot() for TaskStore.load_snapshot and compact_store()
+in place of compact(), see BinarySnapshotStorage.
+"""
+import json
+import os
+import queue
+from contextlib import contextmanager
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+
+from task_snapshot import SnapshotReader, json_to_snapshot, write_snapshot, write_snapshot_file
+from task_store import DUE_FORMAT, TaskStore, parse_due
+
+
+class StorageError(Exception):
+    """Raised when stored task data cannot be read back"""
+
+
+def atomic_write_json(path, data, indent=None):
+    """Write data as JSON to path via a temp file, fsync and rename"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    # Make the rename itself durable where the platform allows it
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def quarantine(path):
+    """Move an unreadable file aside so it is not overwritten, return new path"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    corrupt_path = f"{path}.corrupt-{timestamp}"
+    os.replace(path, corrupt_path)
+    return corrupt_path
+
+
+class JsonStorage:
+    """Whole-file tasks.json storage, rewritten on every save"""
+
+    background_save = True
+
+    def __init__(self, path='tasks.json'):
+        self.path = path
+
+    def load(self):
+        """Load tasks from the JSON file"""
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except json.JSONDecodeError as e:
+            corrupt_path = quarantine(self.path)
+            raise StorageError(
+                f"Could not read {self.path} ({e}); it was moved to {corrupt_path}"
+            )
+
+    def record(self, action, task, fields=None):
+        """Mutations are only persisted by save()"""
+
+    @contextmanager
+    def batch(self):
+        yield
+
+    def save(self, tasks):
+        atomic_write_json(self.path, tasks, indent=4)
+
+    def save_needs_tasks(self):
+        return True
+
+    def needs_compact(self):
+        return False
+
+    def compact(self, tasks, force=False):
+        """Every save is already a full rewrite, so only forced compacts write"""
+        if force:
+            self.save(tasks)
+
+    def close(self):
+        pass
+
+
+class JournalStorage:
+    """Snapshot file plus an append-only journal of task mutations
+
+    Each journal line is "<crc32 hex> <json record>". A record is either
+    {"op": "put", "task": {...}} or {"op": "del", "id": n}. compact()
+    writes a fresh snapshot and truncates the journal.
+    """
+
+    background_save = False
+
+    def __init__(self, path='tasks.json', journal_path=None,
+                 compact_after=1000, fsync=True):
+        self.path = path
+        self.journal_path = journal_path or f"{path}.journal"
+        self.compact_after = compact_after
+        self.fsync = fsync
+        self.journal_records = 0
+        self.recovered_tail = False
+        self._journal = None
+        self._in_batch = False
+
+    def load(self):
+        """Load the snapshot and replay the journal on top of it"""
+        try:
+            with open(self.path, 'r') as f:
+                tasks = json.load(f)
+        except FileNotFoundError:
+            tasks = []
+        except json.JSONDecodeError as e:
+            # The snapshot is written atomically, so this is not a torn write
+            corrupt_path = quarantine(self.path)
+            raise StorageError(
+                f"Could not read {self.path} ({e}); it was moved to {corrupt_path}"
+            )
+
+        return self._apply(tasks, self._replay())
+
+    @staticmethod
+    def _apply(tasks, records):
+        """Return tasks with journal records replayed on top, in order
+
+        Tasks sharing an id are all kept for TaskStore.load to remap; a
+        record applies to the first of them, the one that keeps the id.
+        """
+        tasks = list(tasks)
+        positions = {}
+        for position, task in enumerate(tasks):
+            positions.setdefault(task.get('id'), position)
+        positions.pop(None, None)
+        for record in records:
+            if record['op'] == 'put':
+                task = record['task']
+                position = positions.get(task['id'])
+                if position is None:
+                    positions[task['id']] = len(tasks)
+                    tasks.append(task)
+                else:
+                    tasks[position] = task
+            elif record['op'] == 'del':
+                position = positions.pop(record['id'], None)
+                if position is not None:
+                    tasks[position] = None
+        return [task for task in tasks if task is not None]
+
+    def _replay(self):
+        """Return valid journal records, truncating a damaged tail"""
+        records = []
+        good_offset = 0
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return records
+
+        with f:
+            for line in f:
+                record = self._decode(line)
+                if record is None:
+                    break
+                records.append(record)
+                good_offset += len(line)
+            damaged = f.tell() != good_offset
+
+        if damaged:
+            # A crash mid-append leaves a partial last record; drop it and
+            # anything after it so new appends start on a clean line
+            print(f"DEBUG: Journal damaged after {len(records)} records, truncating")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_offset)
+            self.recovered_tail = True
+
+        self.journal_records = len(records)
+        print(f"DEBUG: Replayed {len(records)} journal records")
+        return records
+
+    @staticmethod
+    def _decode(line):
+        if not line.endswith(b'\n'):
+            return None
+        checksum, _, payload = line.rstrip(b'\n').partition(b' ')
+        try:
+            if int(checksum, 16) != zlib.crc32(payload):
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _encode(record):
+        payload = json.dumps(record, separators=(',', ':')).encode('utf-8')
+        return b'%08x %s\n' % (zlib.crc32(payload), payload)
+
+    def _append(self, record):
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'ab')
+        self._journal.write(self._encode(record))
+        self.journal_records += 1
+        if not self._in_batch:
+            self._sync()
+
+    def _sync(self):
+        if self._journal is None:
+            return
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    @contextmanager
+    def batch(self):
+        """Append records without syncing until the batch ends"""
+        self._in_batch = True
+        try:
+            yield
+        finally:
+            self._in_batch = False
+            self._sync()
+
+    def record(self, action, task, fields=None):
+        """Append one journal record for a store mutation"""
+        if action == 'removed':
+            self._append({'op': 'del', 'id': task['id']})
+        else:
+            self._append({'op': 'put', 'task': task})
+
+    def save(self, tasks):
+        """Mutations are already journaled; compact once the journal grows"""
+        if tasks is not None and self.journal_records >= self.compact_after:
+            self.compact(tasks)
+
+    def save_needs_tasks(self):
+        return self.journal_records >= self.compact_after
+
+    def needs_compact(self):
+        return self.journal_records > 0 or not os.path.exists(self.path)
+
+    def compact(self, tasks, force=False):
+        """Write a fresh snapshot and empty the journal"""
+        if not force and self.journal_records == 0 and os.path.exists(self.path):
+            return
+        self._write_snapshot(tasks)
+        self._truncate_journal()
+
+    def _truncate_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        # Only truncate once the snapshot containing these records is in place
+        with open(self.journal_path, 'wb') as f:
+            os.fsync(f.fileno())
+        self.journal_records = 0
+
+    def _write_snapshot(self, tasks):
+        atomic_write_json(self.path, tasks)
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+class BinarySnapshotStorage(JournalStorage):
+    """Journal storage whose snapshot is a memory-mapped binary file
+
+    open_snapshot() hands the mapped snapshot and the journal records to
+    TaskStore.load_snapshot, which only decodes the tasks it needs, so
+    startup does not parse every completed task. See task_snapshot for the
+    file layout. An existing tasks.json is converted on first use.
+
+    Compaction goes through compact_store(), which copies tasks the store
+    has not decoded straight from the old map; save() never compacts, so
+    save_needs_tasks() is always False.
+    """
+
+    lazy = True
+
+    def __init__(self, path='tasks.snap', json_path='tasks.json', **kwargs):
+        super().__init__(path, **kwargs)
+        self.json_path = json_path
+
+    def open_snapshot(self):
+        """Return (SnapshotReader or None, journal records)"""
+        if not os.path.exists(self.path) and self.json_path and os.path.exists(self.json_path):
+            try:
+                converted = json_to_snapshot(self.json_path, self.path)
+            except ValueError as e:
+                raise StorageError(f"Could not convert {self.json_path} ({e})")
+            print(f"DEBUG: Converted {converted} tasks from {self.json_path} to {self.path}")
+
+        reader = None
+        if os.path.exists(self.path):
+            try:
+                reader = SnapshotReader(self.path)
+            except ValueError as e:
+                corrupt_path = quarantine(self.path)
+                raise StorageError(
+                    f"Could not read {self.path} ({e}); it was moved to {corrupt_path}"
+                )
+        return reader, self._replay()
+
+    def load(self):
+        """Load every task, decoding the whole snapshot"""
+        reader, records = self.open_snapshot()
+        tasks = []
+        if reader is not None:
+            try:
+                tasks = [reader.task(row) for row in range(reader.count)]
+            finally:
+                reader.close()
+        return self._apply(tasks, records)
+
+    def save(self, tasks):
+        """Mutations are already journaled; see compact_store()"""
+
+    def save_needs_tasks(self):
+        return False
+
+    def compact_store(self, store, force=False):
+        """Like compact(), taking the tasks from a TaskStore
+
+        Lazily loaded tasks are copied from the mapped snapshot as stored,
+        so compacting does not decode them.
+        """
+        if not force and self.journal_records == 0 and os.path.exists(self.path):
+            return
+        items, reader = store.lazy_snapshot()
+        tmp_path = f"{self.path}.tmp"
+        write_snapshot_file(tmp_path, items, reader)
+
+        def replace():
+            os.replace(tmp_path, self.path)
+            return SnapshotReader(self.path)
+
+        store.swap_snapshot(replace)
+        self._truncate_journal()
+
+    def _write_snapshot(self, tasks):
+        # tasks come from TaskStore.snapshot(), which has already released
+        # the old map, so the file can be replaced on every platform
+        write_snapshot(self.path, tasks)
+
+
+class SQLiteStorage:
+    """SQLite database with one row per task and indexed filter columns
+
+    The full task dict is kept as JSON in the data column; name, due_date,
+    status, category and priority are copied out into indexed columns so
+    the toolbar filters, Today view and calendar can be answered by query().
+    The due_date column holds the due date as parsed by parse_due, in the
+    zero-padded DUE_FORMAT (NULL when malformed), so comparing strings
+    gives the same ranges as the store. On first use an existing
+    tasks.json is migrated into the database.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            due_date TEXT,
+            status TEXT,
+            category TEXT,
+            priority TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks(due_date);
+        CREATE INDEX IF NOT EXISTS idx_tasks_status_due ON tasks(status, due_date);
+        CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    background_save = False
+
+    def __init__(self, path='tasks.db', json_path='tasks.json'):
+        self.path = path
+        self.json_path = json_path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self.conn.commit()
+        self._in_batch = False
+        self._normalize_due_column()
+
+    @staticmethod
+    def _row(task):
+        return (
+            task['id'],
+            task.get('name', ''),
+            SQLiteStorage._due_column(task),
+            task.get('status', 'Pending'),
+            task.get('category'),
+            task.get('priority', 'Normal'),
+            json.dumps(task, separators=(',', ':')),
+        )
+
+    @staticmethod
+    def _due_column(task):
+        due = parse_due(task.get('due_date'))
+        return due.strftime(DUE_FORMAT) if due is not None else None
+
+    def _normalize_due_column(self):
+        """Rewrite due_date columns written before they were normalized"""
+        if self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'due_column'"
+        ).fetchone():
+            return
+        rows = self.conn.execute("SELECT id, data FROM tasks").fetchall()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE tasks SET due_date = ? WHERE id = ?",
+                ((self._due_column(json.loads(data)), task_id) for task_id, data in rows)
+            )
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('due_column', 'parsed')")
+
+    def _replace_rows(self, tasks):
+        self.conn.execute("DELETE FROM tasks")
+        self.conn.executemany(
+            "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._row(task) for task in tasks if task.get('id') is not None)
+        )
+
+    def _write_all(self, tasks):
+        with self.conn:
+            self._replace_rows(tasks)
+
+    def _rows(self):
+        rows = self.conn.execute("SELECT data FROM tasks ORDER BY id").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def migrate_from_json(self):
+        """One-shot import of tasks.json into the database
+
+        Returns the number of tasks migrated. Tasks already in the database
+        (added after an earlier migration failed) are kept after the ones
+        from tasks.json; the store gives ids to tasks missing one and
+        remaps repeated ids, so the rows can always be written.
+        """
+        migrated = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'migrated_from_json'"
+        ).fetchone()
+        if migrated or not os.path.exists(self.json_path):
+            return 0
+
+        tasks = JsonStorage(self.json_path).load()
+        print(f"DEBUG: Migrating {len(tasks)} tasks from {self.json_path} to {self.path}")
+        store = TaskStore()
+        remapped = store.load(tasks + self._rows())
+        if remapped:
+            print(f"DEBUG: Gave {remapped} migrated tasks new ids")
+        # The rows and the flag are written together, so a failed migration
+        # is retried on the next start
+        with self.conn:
+            self._replace_rows(store.all())
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('migrated_from_json', ?)",
+                (datetime.now().isoformat(),)
+            )
+        return len(tasks)
+
+    def load(self):
+        """Load all tasks, migrating tasks.json on first use"""
+        try:
+            self.migrate_from_json()
+            return self._rows()
+        except (sqlite3.DatabaseError, ValueError) as e:
+            raise StorageError(f"Could not read {self.path}: {e}")
+
+    def record(self, action, task, fields=None):
+        """Write a single task row for a store mutation"""
+        if action == 'removed':
+            self.conn.execute("DELETE FROM tasks WHERE id = ?", (task['id'],))
+        else:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._row(task)
+            )
+        if not self._in_batch:
+            self.conn.commit()
+
+    @contextmanager
+    def batch(self):
+        """Write all records in the batch as one transaction"""
+        self._in_batch = True
+        try:
+            yield
+        finally:
+            self._in_batch = False
+            self.conn.commit()
+
+    def save(self, tasks):
+        """Every mutation is already committed by record()"""
+
+    def save_needs_tasks(self):
+        return False
+
+    def needs_compact(self):
+        return False
+
+    def compact(self, tasks, force=False):
+        """Rewrite all rows when forced; SQLite tidies itself up on close"""
+        if force:
+            self._write_all(tasks)
+
+    def query(self, category=None, priority=None, status=None,
+              due_from=None, due_to=None):
+        """Return ids of tasks matching all given criteria, in id order
+
+        due_from/due_to are "YYYY-MM-DD" style prefixes of due_date giving a
+        half-open range. Text search is answered by TaskStore.search.
+        """
+        clauses = []
+        params = []
+        for column, value in (('category', category), ('priority', priority),
+                              ('status', status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if due_from is not None:
+            clauses.append("due_date >= ?")
+            params.append(due_from)
+        if due_to is not None:
+            clauses.append("due_date < ?")
+            params.append(due_to)
+
+        sql = "SELECT id FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        return [task_id for (task_id,) in self.conn.execute(sql, params)]
+
+    def close(self):
+        self.conn.execute("PRAGMA optimize")
+        self.conn.close()
+
+
+class BackgroundSaver:
+    """Saves task snapshots through a storage backend, skipping clean states
+
+    Callers submit (version, tasks) where version is the store version the
+    snapshot was taken at. Submissions made while a write is in progress are
+    coalesced so only the newest snapshot is written. Results are put on the
+    results queue as (version, seconds, error) for the caller to collect on
+    its own thread; the caller reports failures back with failed(version).
+    Only the caller's thread sets submitted_version and only the worker
+    sets saved_version, both under a lock.
+    """
+
+    def __init__(self, storage, saved_version=0):
+        self.storage = storage
+        self.saved_version = saved_version
+        self.submitted_version = saved_version
+        self._lock = threading.Lock()
+        self.results = queue.Queue()
+        self._jobs = queue.Queue()
+        self._thread = None
+        if getattr(storage, 'background_save', False):
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def is_dirty(self, version):
+        """True when version has not been saved or submitted yet"""
+        with self._lock:
+            return version != self.submitted_version
+
+    def busy(self):
+        """True while submitted snapshots are still being written"""
+        with self._lock:
+            return self.submitted_version != self.saved_version or not self._jobs.empty()
+
+    def flush(self):
+        """Wait until every submitted snapshot has been written
+
+        Call this before writing through the storage from another thread
+        (e.g. a forced compact), so a queued older snapshot cannot land on
+        top of it afterwards.
+        """
+        if self._thread is not None:
+            self._jobs.join()
+
+    def mark_saved(self, version):
+        """Record that version was persisted by other means (e.g. compact)"""
+        with self._lock:
+            self.saved_version = self.submitted_version = version
+
+    def failed(self, version):
+        """Record that saving version failed, so the next request retries
+
+        A newer submission made in the meantime is left alone; it will be
+        written (or fail) on its own.
+        """
+        with self._lock:
+            if self.submitted_version == version:
+                self.submitted_version = self.saved_version
+
+    def submit(self, version, tasks):
+        """Queue a snapshot for saving, or save it now for inline backends"""
+        with self._lock:
+            self.submitted_version = version
+        if self._thread is None:
+            self._save(version, tasks)
+        else:
+            self._jobs.put((version, tasks))
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            taken = 1
+            stop = job is None
+            # Coalesce: only the newest queued snapshot needs writing
+            while True:
+                try:
+                    newer = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if newer is None:
+                    stop = True
+                else:
+                    job = newer
+            if job is not None:
+                self._save(*job)
+            # Only now are the coalesced jobs done, see flush()
+            for _ in range(taken):
+                self._jobs.task_done()
+            if stop:
+                return
+
+    def _save(self, version, tasks):
+        start = time.perf_counter()
+        try:
+            self.storage.save(tasks)
+        except Exception as e:
+            # The caller marks the version dirty again, see failed()
+            self.results.put((version, time.perf_counter() - start, e))
+            return
+        with self._lock:
+            # A snapshot written late (e.g. after mark_saved) never moves
+            # saved_version back, or busy() would stay True
+            self.saved_version = max(self.saved_version, version)
+        self.results.put((version, time.perf_counter() - start, None))
+
+    def close(self, timeout=10):
+        """Finish pending writes and stop the worker thread"""
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def open_storage(mode, path='tasks.json'):
+    """Create the storage backend named by the 'storage' setting"""
+    if mode == 'journal':
+        return JournalStorage(path)
+    if mode == 'binary':
+        return BinarySnapshotStorage(json_path=path)
+    if mode == 'sqlite':
+        return SQLiteStorage(json_path=path)
+    return JsonStorage(path)
@@ -0,0 +1,617 @@
+"""Headless task storage for Task Reminder.
+
+TaskStore only deals in task dicts and ids; tasks.py keeps everything
+about widgets, so the store can be driven from tests and benchmarks.
+"""
+from bisect import bisect_left, insort
+from datetime import datetime, time, timedelta
+
+from task_search import SEARCH_FIELDS, SearchIndex
+
+
+DUE_FORMAT = "%Y-%m-%d %H:%M"
+
+# Fields with a per-value id set index, and the value used when missing
+FACETS = {'category': None, 'priority': 'Normal', 'status': 'Pending'}
+
+PRIORITY_RANK = {"Low": 0, "Normal": 1, "Medium": 2, "High": 3, "Urgent": 4}
+STATUS_RANK = {"Pending": 0, "Completed": 1}
+SORT_CACHE_SIZE = 8  # Sorted permutations kept per data version
+
+_LAZY = object()  # Placeholder for a task that is still only in a snapshot
+
+
+def due_bounds(period, today):
+    """Return the half-open (start, end) datetimes for a Due filter period
+
+    A task matches when start <= due < end; (None, None) means no filter.
+    """
+    if period == "Today":
+        start, end = today, today + timedelta(days=1)
+    elif period == "This Week":
+        start, end = today, today + timedelta(days=8)
+    elif period == "This Month":
+        start = today.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+    else:
+        return None, None
+    return datetime.combine(start, time()), datetime.combine(end, time())
+
+
+def due_range(period, today):
+    """Return the half-open (start, end) date strings for a Due filter period
+
+    Due dates are "YYYY-MM-DD HH:MM" strings, which sort chronologically,
+    so a task matches when start <= due_date < end.
+    """
+    start, end = due_bounds(period, today)
+    if start is None:
+        return None, None
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def parse_due(due_date):
+    """Parse a "YYYY-MM-DD HH:MM" due date, returning None if malformed"""
+    try:
+        return datetime.strptime(due_date, DUE_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+class TaskStore:
+    """In-memory collection of task dicts indexed by task id"""
+
+    def __init__(self, tasks=None):
+        self._tasks = {}  # task id -> task dict, kept in insertion order
+        self.next_task_id = 1
+        self.version = 0  # Bumped on every mutation, used for dirty tracking
+        self._loaded_version = 0  # version when the contents were last replaced
+        self._changed = {}  # task id -> version of its last add or update
+        self._listeners = []
+        self._reader = None  # SnapshotReader backing lazily loaded tasks
+        self._rows = {}  # task id -> snapshot row, for tasks not decoded yet
+        self._due = {}  # task id -> parsed due date, see due()
+        self._due_index = None  # Sorted (due, task id) list, see due_between()
+        self._facets = None  # field -> value -> set of task ids, see matching()
+        self._search = None  # SearchIndex, see search()
+        self._sort_version = None  # version the sorted permutations belong to
+        self._sort_keys = {}  # field -> {task id: typed sort key}, per task
+        self._sorted = {}  # (fields, ids) -> (directions, sorted ids)
+        if tasks:
+            self.load(tasks)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        self._materialize_all()
+        return iter(list(self._tasks.values()))
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def subscribe(self, callback):
+        """Register callback(action, task, fields) to be called on mutations
+
+        action is 'added', 'updated' or 'removed'; fields is the set of
+        changed field names for updates and None otherwise.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, action, task, fields=None):
+        self.version += 1
+        if action == 'removed':
+            self._changed.pop(task['id'], None)
+        else:
+            self._changed[task['id']] = self.version
+        # Only this task's sort keys are outdated
+        for keys in self._sort_keys.values():
+            keys.pop(task['id'], None)
+        for callback in self._listeners:
+            callback(action, task, fields)
+
+    def load(self, tasks):
+        """Replace the store contents with the given task dicts
+
+        Returns the number of tasks that had to be given a new id.
+        """
+        self._release_snapshot()
+        self._tasks = {}
+        self._due = {}
+        self._due_index = None
+        self._facets = None
+        self._search = None
+        self._sort_keys = {}
+        self.next_task_id = 1
+        self.version += 1
+        self._loaded_version = self.version
+        self._changed = {}
+
+        # Keep existing ids where possible so Treeview iids stay stable
+        pending = []
+        for task in tasks:
+            task_id = task.get('id')
+            if isinstance(task_id, int) and task_id not in self._tasks:
+                self._tasks[task_id] = task
+                self.next_task_id = max(self.next_task_id, task_id + 1)
+            else:
+                pending.append(task)
+
+        # Tasks without an id (or with a duplicate one) get a fresh id
+        for task in pending:
+            task['id'] = self.next_task_id
+            self.next_task_id += 1
+            self._tasks[task['id']] = task
+        return len(pending)
+
+    def load_snapshot(self, reader, records=()):
+        """Replace the store contents with the tasks in a SnapshotReader
+
+        Completed tasks stay in the memory-mapped snapshot until something
+        asks for them; everything else is decoded now. records are journal
+        records ({'op': 'put', 'task': ...} or {'op': 'del', 'id': ...})
+        applied on top of the snapshot.
+        """
+        self._release_snapshot()
+        self._tasks = {}
+        self._due = {}
+        self._due_index = None
+        self._facets = None
+        self._search = None
+        self._sort_keys = {}
+        self.next_task_id = 1
+        self.version += 1
+        self._loaded_version = self.version
+        self._changed = {}
+
+        if reader is not None:
+            self._reader = reader
+            strings = reader.strings
+            completed = strings.index('Completed') if 'Completed' in strings else None
+            ids, status, due = reader.id, reader.status, reader.due
+            for row in range(reader.count):
+                task_id = ids[row]
+                # Rows without a columnar due date are decoded so that
+                # fields() never has to parse JSON
+                if status[row] == completed and due[row] >= 0:
+                    self._tasks[task_id] = _LAZY
+                    self._rows[task_id] = row
+                else:
+                    self._tasks[task_id] = reader.task(row)
+            if ids:
+                self.next_task_id = max(ids) + 1
+
+        for record in records:
+            if record['op'] == 'put':
+                task = record['task']
+                self._rows.pop(task['id'], None)
+                self._due.pop(task['id'], None)
+                self._tasks[task['id']] = task
+                self.next_task_id = max(self.next_task_id, task['id'] + 1)
+            elif record['op'] == 'del':
+                self._rows.pop(record['id'], None)
+                self._tasks.pop(record['id'], None)
+
+        if not self._rows:
+            self._release_snapshot()
+
+    def _materialize(self, task_id):
+        task = self._reader.task(self._rows.pop(task_id))
+        self._tasks[task_id] = task
+        if not self._rows:
+            self._release_snapshot()
+        return task
+
+    def _materialize_all(self):
+        if not self._rows:
+            return
+        for task_id, row in self._rows.items():
+            self._tasks[task_id] = self._reader.task(row)
+        self._rows = {}
+        self._release_snapshot()
+
+    def _release_snapshot(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        self._rows = {}
+
+    def all(self):
+        """Return all tasks as a list"""
+        self._materialize_all()
+        return list(self._tasks.values())
+
+    def select(self, status=None):
+        """Return tasks with the given status (all tasks for None)
+
+        Lazily loaded tasks are only decoded when they match.
+        """
+        if status is None:
+            return self.all()
+        return [self.get(task_id) for task_id in sorted(self.matching(status=status))]
+
+    def _build_facets(self):
+        if self._facets is None:
+            facets = {field: {} for field in FACETS}
+            for fields in self.fields():
+                for field, default in FACETS.items():
+                    facets[field].setdefault(fields.get(field, default), set()).add(fields['id'])
+            self._facets = facets
+        return self._facets
+
+    def matching(self, **criteria):
+        """Return the set of task ids whose facet fields equal the given values
+
+        Keywords are names from FACETS; a value of None means any value.
+        Each value has an id set maintained on mutation, so combining
+        filters is a set intersection rather than a scan.
+        """
+        facets = self._build_facets()
+        result = None
+        # Intersect the smallest sets first
+        sets = sorted(
+            (facets[field].get(value, set()) for field, value in criteria.items()
+             if value is not None),
+            key=len
+        )
+        for ids in sets:
+            result = set(ids) if result is None else result & ids
+            if not result:
+                break
+        return set(self._tasks) if result is None else result
+
+    def facet_counts(self, field):
+        """Return {value: number of tasks} for a FACETS field"""
+        return {
+            value: len(ids) for value, ids in self._build_facets()[field].items() if ids
+        }
+
+    def search(self, query, within=None):
+        """Return ids of tasks whose name, category or notes match query
+
+        Results are ranked best first, see SearchIndex.search. If within is
+        given, only those task ids are considered (see SearchIndex.narrow).
+        The index is built on first use unless build_search() already did.
+        """
+        index = self.build_search()
+        if within is not None:
+            return index.narrow(query, within)
+        return index.search(query)
+
+    def build_search(self):
+        """Build the search index if needed and return it
+
+        Lazily loaded tasks are decoded for indexing but stay lazy. The
+        index is then kept up to date by add(), update() and remove().
+        """
+        if self._search is None:
+            index = SearchIndex()
+            index.build(
+                self._reader.task(self._rows[task_id]) if task is _LAZY else task
+                for task_id, task in self._tasks.items()
+            )
+            self._search = index
+        return self._search
+
+    def _facet_add(self, task):
+        if self._facets is not None:
+            for field, default in FACETS.items():
+                self._facets[field].setdefault(task.get(field, default), set()).add(task['id'])
+
+    def _facet_remove(self, task):
+        if self._facets is not None:
+            for field, default in FACETS.items():
+                self._facets[field].get(task.get(field, default), set()).discard(task['id'])
+
+    def fields(self):
+        """Yield id, due_date, status, priority and category of every task
+
+        Lazily loaded tasks are read from the snapshot columns without being
+        decoded; for other tasks the task dict itself is yielded, so callers
+        must treat the results as read-only.
+        """
+        for task_id, task in list(self._tasks.items()):
+            if task is _LAZY:
+                yield self._reader.fields(self._rows[task_id])
+            else:
+                yield task
+
+    def snapshot(self):
+        """Return shallow copies of all tasks, safe to hand to another thread
+
+        Task values are replaced, never mutated in place, by update(), so
+        copying the top-level dicts is enough for a consistent snapshot.
+        """
+        self._materialize_all()
+        return [dict(task) for task in self._tasks.values()]
+
+    def lazy_snapshot(self):
+        """Like snapshot(), without decoding lazily loaded tasks
+
+        Returns (items, reader): items holds a copy of each task, or for a
+        task still only in the mapped snapshot its row number in reader
+        (None when nothing is lazy). See task_snapshot.write_snapshot_file.
+        """
+        items = [
+            self._rows[task_id] if task is _LAZY else dict(task)
+            for task_id, task in self._tasks.items()
+        ]
+        return items, self._reader
+
+    def swap_snapshot(self, open_reader):
+        """Move lazily loaded tasks over to a rewritten snapshot file
+
+        The current map is released first, so the file can be replaced on
+        every platform; open_reader() then puts the new file in place and
+        returns a SnapshotReader for it, which must hold every lazy task.
+        """
+        lazy = set(self._rows)
+        old = self._reader
+        if old is not None:
+            old.close()
+            self._reader = None
+        try:
+            reader = open_reader()
+        except Exception:
+            # The old file is still in place; keep reading from it
+            if lazy:
+                self._reader = old.reopen()
+            raise
+        if not lazy:
+            reader.close()
+            return
+        self._reader = reader
+        self._rows = {
+            task_id: row for row, task_id in enumerate(reader.id) if task_id in lazy
+        }
+
+    def get(self, task_id):
+        """Return the task with the given id, or None"""
+        task = self._tasks.get(task_id)
+        if task is _LAZY:
+            task = self._materialize(task_id)
+        return task
+
+    def due(self, task):
+        """Return a task's due date as a datetime, or None if malformed
+
+        The due_date string is parsed once and cached until the task's
+        due_date is changed through update(). Lazily loaded tasks are
+        answered from the snapshot column without decoding them.
+        """
+        task_id = task['id']
+        try:
+            return self._due[task_id]
+        except KeyError:
+            pass
+        if task_id in self._rows:
+            due = self._reader.due_datetime(self._rows[task_id])
+        else:
+            due = parse_due(task.get('due_date'))
+        if task_id in self._tasks:
+            self._due[task_id] = due
+        return due
+
+    def due_of(self, task_id):
+        """Like due(), by id, without decoding a lazily loaded task"""
+        if task_id in self._due or task_id in self._rows:
+            return self.due({'id': task_id})
+        task = self.get(task_id)
+        return self.due(task) if task is not None else None
+
+    def due_between(self, start, end, ids=None):
+        """Return tasks with start <= due < end, ordered by due date
+
+        If ids is given, only tasks whose id is in it are returned.
+        """
+        return [self.get(task_id) for task_id in self.due_ids_between(start, end, ids)]
+
+    def due_ids_between(self, start, end, ids=None):
+        """Like due_between(), but returning task ids, so nothing is decoded
+
+        Answered from a sorted (due, task id) index, built on first use and
+        kept up to date by add(), update() and remove(), so only the
+        matching tasks are visited. Tasks with a malformed due date are
+        never returned.
+        """
+        if self._due_index is None:
+            index = []
+            for fields in self.fields():
+                due = self.due(fields)
+                if due is not None:
+                    index.append((due, fields['id']))
+            index.sort()
+            self._due_index = index
+        index = self._due_index
+        # Task ids are ints, so (due, 0) sorts before every task due then
+        lo = bisect_left(index, (start, 0))
+        hi = bisect_left(index, (end, 0), lo)
+        return [
+            task_id for _, task_id in index[lo:hi]
+            if ids is None or task_id in ids
+        ]
+
+    def _index_add(self, task):
+        if self._due_index is not None:
+            due = self.due(task)
+            if due is not None:
+                insort(self._due_index, (due, task['id']))
+
+    def _index_remove(self, task_id):
+        due = self._due.pop(task_id, None)
+        if self._due_index is not None and due is not None:
+            index = self._due_index
+            position = bisect_left(index, (due, task_id))
+            if position < len(index) and index[position] == (due, task_id):
+                del index[position]
+
+    def add(self, task):
+        """Add a new task, assigning it an id, and return it"""
+        task['id'] = self.next_task_id
+        self.next_task_id += 1
+        self._tasks[task['id']] = task
+        self._index_add(task)
+        self._facet_add(task)
+        if self._search is not None:
+            self._search.add(task)
+        self._notify('added', task)
+        return task
+
+    def add_many(self, tasks):
+        """Add tasks in one pass, keeping their ids unless already taken
+
+        Returns the number of tasks that were given a new id.
+        """
+        tasks = list(tasks)
+        # New ids start above every incoming id, so a remapped task never
+        # takes an id that a later task in the batch could have kept
+        for task in tasks:
+            task_id = task.get('id')
+            if isinstance(task_id, int):
+                self.next_task_id = max(self.next_task_id, task_id + 1)
+        remapped = 0
+        for task in tasks:
+            task_id = task.get('id')
+            if not (isinstance(task_id, int) and task_id not in self._tasks):
+                if task_id is not None:
+                    remapped += 1
+                task['id'] = self.next_task_id
+                self.next_task_id += 1
+            self._tasks[task['id']] = task
+            self._index_add(task)
+            self._facet_add(task)
+            if self._search is not None:
+                self._search.add(task)
+            self._notify('added', task)
+        return remapped
+
+    def update(self, task_id, changes, drop=()):
+        """Apply a dict of field changes to a task and return it
+
+        Fields named in drop are removed from the task.
+        """
+        task = self.get(task_id)
+        if task is None:
+            return None
+        task_id = task['id']
+        changes = {k: v for k, v in changes.items() if k != 'id'}
+        self._facet_remove(task)
+        task.update(changes)
+        fields = set(changes)
+        for field in drop:
+            if task.pop(field, None) is not None:
+                fields.add(field)
+        self._facet_add(task)
+        if 'due_date' in fields:
+            self._index_remove(task_id)
+            self._index_add(task)
+        if self._search is not None and fields & SEARCH_FIELDS.keys():
+            self._search.add(task)
+        self._notify('updated', task, fields)
+        return task
+
+    def remove(self, task_id):
+        """Remove a task by id and return it, or None if it was not found"""
+        task = self.get(task_id)
+        if task is not None:
+            del self._tasks[task_id]
+            self._index_remove(task_id)
+            self._facet_remove(task)
+            if self._search is not None:
+                self._search.remove(task_id)
+            self._notify('removed', task)
+        return task
+
+    def revision(self, task_id):
+        """Return a number that changes whenever the task changes
+
+        Views use it to cache whatever they derive from a task.
+        """
+        return self._changed.get(task_id, self._loaded_version)
+
+    def _sort_key(self, field, task_id):
+        if field == 'name':
+            task = self.get(task_id)
+            return str(task.get('name', '')).casefold()
+        # The other keys can be read without decoding lazy tasks
+        task = self._tasks[task_id]
+        fields = self._reader.fields(self._rows[task_id]) if task is _LAZY else task
+        if field == 'priority':
+            return PRIORITY_RANK.get(fields.get('priority', 'Normal'), 1)
+        if field == 'status':
+            return STATUS_RANK.get(fields.get('status', 'Pending'), len(STATUS_RANK))
+        if field == 'due':
+            # Malformed due dates sort last
+            due = self.due(fields)
+            return (0, due) if due is not None else (1, datetime.min)
+        return str(fields.get(field, '')).casefold()
+
+    def sort_ids(self, ids, columns):
+        """Return task ids ordered by columns, a list of (field, descending)
+
+        Fields are 'name', 'category', 'priority' (by rank), 'due' (by
+        parsed due date) and 'status'. The first column is the primary key
+        and the sort is stable, so ties keep their order in ids.
+
+        Sort keys are cached per task until that task changes. Results are
+        cached until the next mutation, keyed by the fields and ids without
+        the directions, so toggling the primary column's direction reverses
+        the cached order (groups of ties keep their inner order) instead of
+        sorting again.
+        """
+        if self._sort_version != self.version:
+            self._sort_version = self.version
+            self._sorted = {}
+        # Ids of tasks removed since the caller got them are dropped
+        ids = [task_id for task_id in ids if task_id in self._tasks]
+        directions = tuple(descending for _, descending in columns)
+        cache_key = (tuple(field for field, _ in columns), tuple(ids))
+        cached = self._sorted.get(cache_key)
+        if cached is not None:
+            cached_directions, order = cached
+            if cached_directions == directions:
+                return list(order)
+            if cached_directions[1:] == directions[1:]:
+                order = self._reverse_runs(order, self._keys(columns[0][0], order))
+                self._sorted[cache_key] = (directions, order)
+                return list(order)
+
+        # Stable sorts from the least to the most significant column
+        for field, descending in reversed(columns):
+            ids.sort(key=self._keys(field, ids).__getitem__, reverse=descending)
+
+        if len(self._sorted) >= SORT_CACHE_SIZE:
+            self._sorted.pop(next(iter(self._sorted)))
+        self._sorted[cache_key] = (directions, tuple(ids))
+        return ids
+
+    def _keys(self, field, ids):
+        """Sort keys of field for ids, filling in the missing ones"""
+        keys = self._sort_keys.setdefault(field, {})
+        for task_id in ids:
+            if task_id not in keys:
+                keys[task_id] = self._sort_key(field, task_id)
+        return keys
+
+    @staticmethod
+    def _reverse_runs(order, keys):
+        """Reverse order by its primary key, keeping each run of equal keys as is"""
+        runs = []
+        start = 0
+        for index in range(1, len(order) + 1):
+            if index == len(order) or keys[order[index]] != keys[order[start]]:
+                runs.append(order[start:index])
+                start = index
+        return tuple(task_id for run in reversed(runs) for task_id in run)
+
+    @staticmethod
+    def iid(task):
+        """Treeview item id for a task"""
+        return str(task['id'])
+
+    def from_iid(self, iid):
+        """Return the task for a Treeview item id, or None"""
+        try:
+            return self.get(int(iid))
+        except (TypeError, ValueError):
+            return None
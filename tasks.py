@@ -1,20 +1,62 @@
+import time
+_IMPORT_START = time.perf_counter()
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 from ttkthemes import ThemedTk
 import json
 from datetime import datetime, timedelta
 import threading
-from tkinter import messagebox, colorchooser, filedialog
+import queue
+from tkinter import messagebox, filedialog
 import os
 import sys
-import pygame  # For sound
-from PIL import Image, ImageTk
-import webbrowser
-import calendar
-from tkcalendar import Calendar
-import pyperclip
-from plyer import notification  # Add this import at the top
-import urllib.parse
+# tkcalendar, plyer, pygame, PIL, pystray, pyperclip and webbrowser are
+# imported where they are first used, so they don't slow down startup
+from task_store import FACETS, PRIORITY_RANK, TaskStore, due_bounds, due_range, parse_due
+from task_storage import BackgroundSaver, StorageError, open_storage
+from task_backup import DEFAULT_RETENTION, BackupManager
+from task_io import export_tasks, load_import
+from task_search import SEARCH_FIELDS, highlight
+from task_reminders import ReminderSchedule
+from task_alerts import AlertDispatcher
+from task_audio import SoundPlayer
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
+
+def calendar_widget(parent, **options):
+    """Create a tkcalendar Calendar, importing tkcalendar on first use"""
+    from tkcalendar import Calendar
+    return Calendar(parent, **options)
+
+
+def send_notification(**options):
+    """Show a plyer desktop notification, importing plyer on first use"""
+    from plyer import notification
+    notification.notify(**options)
+
+
+class StartupReport:
+    """Durations of the startup phases, printed with --startup-report"""
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.phases = [("imports", _IMPORT_SECONDS)]
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Record the time since the previous mark as the duration of phase"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def print(self):
+        if not self.enabled:
+            return
+        print("Startup report:")
+        for phase, seconds in self.phases:
+            print(f"  {phase:<15} {seconds * 1000:8.1f} ms")
+        total = sum(seconds for _, seconds in self.phases)
+        print(f"  {'total':<15} {total * 1000:8.1f} ms")
 
 class CustomStyle:
     # Colors
@@ -94,8 +136,286 @@ class CustomStyle:
         button.pack(expand=True, fill="both")
         return button_frame
 
+class TreeRows:
+    """Keeps a Treeview's top-level items in step with a list of rows
+
+    Rows are (item id, values, tags). reconcile() compares them with what
+    is already shown and only inserts, deletes, moves or updates the items
+    that differ, so a change to one task touches one row.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._shown = {}  # item id -> (values, tags) as last written
+        self._order = []  # Item ids in display order
+
+    def reconcile(self, rows):
+        """Make the Treeview show exactly rows, in order"""
+        wanted = {iid for iid, _, _ in rows}
+        stale = [iid for iid in self._order if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self._shown[iid]
+        order = [iid for iid in self._order if iid in wanted]
+        
+        for index, (iid, values, tags) in enumerate(rows):
+            shown = self._shown.get(iid)
+            if shown is None:
+                self.tree.insert('', index, iid=iid, values=values, tags=tags)
+                order.insert(index, iid)
+            else:
+                if shown != (values, tags):
+                    self.tree.item(iid, values=values, tags=tags)
+                if order[index] != iid:
+                    self.tree.move(iid, '', index)
+                    order.remove(iid)
+                    order.insert(index, iid)
+            self._shown[iid] = (values, tags)
+        self._order = order
+
+    def __contains__(self, iid):
+        return iid in self._shown
+
+
+class ViewUpdates:
+    """Routes task changes to the views that show them, rendered when idle
+
+    Each view registers render(changes) and visible(). A store change marks
+    every view dirty; one after_idle flush then renders the dirty views
+    that are visible. Hidden views (another tab, or the window minimized)
+    keep their changes until flush() runs while they are shown. changes
+    maps task id -> set of changed fields, or None for tasks that were
+    added or removed; changes itself is None when the view has to redraw
+    everything.
+    """
+
+    MAX_TRACKED = 1000  # More changed tasks than this redraw the view
+
+    def __init__(self, root):
+        self.root = root
+        self._views = {}  # name -> (render, visible)
+        self._dirty = {}  # name -> changes
+        self._after_id = None
+
+    def register(self, name, render, visible):
+        """Add a view; it is rendered on its next change"""
+        self._views[name] = (render, visible)
+
+    def on_change(self, action, task, fields=None):
+        """TaskStore listener: mark every view dirty for this task"""
+        if not self._views:
+            return
+        task_id = task['id']
+        for name in self._views:
+            changes = self._dirty.setdefault(name, {})
+            if changes is None:
+                continue
+            if action == 'updated' and fields is not None and changes.get(task_id, set()) is not None:
+                changes[task_id] = changes.get(task_id, set()) | fields
+            else:
+                changes[task_id] = None
+            if len(changes) > self.MAX_TRACKED:
+                self._dirty[name] = None
+        self._schedule()
+
+    def invalidate(self, name=None):
+        """Make one view, or every view, redraw completely"""
+        for view in ([name] if name else self._views):
+            self._dirty[view] = None
+        self._schedule()
+
+    def _schedule(self):
+        if self._after_id is None:
+            self._after_id = self.root.after_idle(self.flush)
+
+    def flush(self):
+        """Render the dirty views that are visible now"""
+        self._after_id = None
+        for name, (render, visible) in list(self._views.items()):
+            if name in self._dirty and visible():
+                # One failing view must not leave the others dirty
+                try:
+                    render(self._dirty.pop(name))
+                except Exception as e:
+                    print(f"DEBUG: Error updating view '{name}': {e}")
+
+
+class VirtualTreeview:
+    """Shows a long list of rows through a window of ttk.Treeview items
+
+    Only the visible rows, plus OVERSCAN rows on either side, exist as
+    Treeview items. The scrollbar, mouse wheel and arrow/page keys move
+    over the full logical list of item ids, and the selection is kept for
+    rows that are scrolled out of the window. row(iid) returns the
+    (values, tags) to show for an item id; it is called for every rendered
+    row on each render, so it should be cheap (cached) for unchanged rows.
+    """
+
+    OVERSCAN = 20  # Rendered rows kept above and below the visible ones
+    WHEEL_ROWS = 3  # Rows scrolled per mouse wheel step
+
+    def __init__(self, tree, scrollbar, row, on_select=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row = row
+        self.on_select = on_select
+        self.rows = []  # Logical list of item ids
+        self._positions = {}  # item id -> index in rows
+        self._rendered = []  # Item ids currently in the Treeview, in order
+        self._items = TreeRows(tree)
+        self._selected = []  # Selected item ids, rendered or not
+        self.first = 0  # Index of the top visible row
+        self.visible = 20  # Rows that fit in the widget, see _on_configure
+        
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand=lambda first, last: None)
+        tree.bind('<Configure>', self._on_configure, add='+')
+        tree.bind('<<TreeviewSelect>>', self._on_select)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            tree.bind(sequence, self._on_wheel)
+        for key in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            tree.bind(key, self._on_key)
+
+    def set_rows(self, rows):
+        """Replace the logical row list"""
+        self.rows = list(rows)
+        self._positions = {iid: index for index, iid in enumerate(self.rows)}
+        self._selected = [iid for iid in self._selected if iid in self._positions]
+        self._render()
+
+    def refresh(self, iids):
+        """Redraw after the values of some rows changed"""
+        if not set(iids).isdisjoint(self._rendered):
+            self._render()
+
+    def selection(self):
+        """Selected item ids, including rows outside the rendered window"""
+        return tuple(self._selected)
+
+    def select(self, iid):
+        """Select an item id and scroll it into view"""
+        index = self._positions.get(iid)
+        if index is None:
+            return False
+        self._selected = []
+        self.see(index)
+        # <<TreeviewSelect>> then reports the new selection to on_select
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        return True
+
+    def clear_selection(self):
+        """Deselect every row"""
+        self._selected = []
+        if self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+
+    def see(self, index):
+        """Scroll so the row at index is visible"""
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + self.visible:
+            self.first = index - self.visible + 1
+        self._render()
+
+    def yview(self, *args):
+        """Scrollbar command: 'moveto fraction' or 'scroll n units|pages'"""
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * len(self.rows))
+        elif args[0] == 'scroll':
+            step = self.visible if args[2] == 'pages' else 1
+            self.first += int(args[1]) * step
+        self._render()
+
+    def _render(self):
+        total = len(self.rows)
+        self.first = max(0, min(self.first, total - self.visible))
+        start = max(0, self.first - self.OVERSCAN)
+        window = self.rows[start:self.first + self.visible + self.OVERSCAN]
+        
+        # Only rows entering or leaving the window, or whose values
+        # changed, touch the Treeview
+        self._items.reconcile([(iid,) + tuple(self.row(iid)) for iid in window])
+        self._rendered = window
+        
+        keep = set(window)
+        selected = [iid for iid in self._selected if iid in keep]
+        if selected:
+            self.tree.selection_set(selected)
+        
+        # Put the first visible row at the top of the widget
+        if window:
+            self.tree.yview_moveto((self.first - start) / len(window))
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_configure(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup('Treeview', 'rowheight') or 20)
+        visible = max(1, event.height // row_height - 1)  # Less the heading
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
+
+    def _on_select(self, event):
+        current = list(self.tree.selection())
+        if current:
+            selected = current
+        else:
+            # Rows scrolled out of the window stay selected
+            rendered = set(self._rendered)
+            selected = [iid for iid in self._selected if iid not in rendered]
+        if selected != self._selected:
+            self._selected = selected
+            if self.on_select:
+                self.on_select(event)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.first -= self.WHEEL_ROWS
+        else:
+            self.first += self.WHEEL_ROWS
+        self._render()
+        return "break"
+
+    def _on_key(self, event):
+        if not self.rows:
+            return "break"
+        current = self._positions.get(self._selected[-1]) if self._selected else None
+        if current is None:
+            current = self.first - 1
+        moves = {
+            'Up': current - 1,
+            'Down': current + 1,
+            'Prior': current - self.visible,
+            'Next': current + self.visible,
+            'Home': 0,
+            'End': len(self.rows) - 1,
+        }
+        index = max(0, min(moves.get(event.keysym, current), len(self.rows) - 1))
+        self.select(self.rows[index])
+        return "break"
+
+
 class TaskReminder:
+    SAVE_DELAY_MS = 500  # Quiet period before coalesced changes are written
+    SEARCH_DELAY_MS = 150  # Typing pause before the search box is applied
+    MAX_REMINDER_WAIT_MS = 300000  # Re-check at least this often, in case the clock jumps
+    REMINDER_COALESCE_MS = 1000  # Reminders firing this close together share one alert
+    ALERT_TIMEOUT_S = 10  # A notification or sound taking longer is abandoned
+    # Alert kind -> (count, seconds): at most count alerts per window
+    ALERT_RATE_LIMITS = {'notification': (5, 60), 'sound': (3, 10)}
+    SOUNDS = {'reminder': 'reminder.wav'}  # Sound name -> file
+    SOUND_PRELOAD_MS = 60000  # Decode sounds once a reminder is this close
+    # Main list column -> TaskStore.sort_ids field
+    SORT_FIELDS = {"Task": "name", "Category": "category", "Priority": "priority",
+                   "Due Date": "due", "Status": "status"}
+
     def __init__(self, root):
+        self.startup = StartupReport('--startup-report' in sys.argv)
         self.root = root
         self.app_name = "Task Reminder"  # Add this line for consistent naming
         self.root.title(self.app_name)
@@ -107,19 +427,36 @@ class TaskReminder:
         # Set main window icon
         self.set_window_icon(self.root)
         
-        self.root.set_theme("arc")
+        # With --minimized only the store, reminders and tray icon start;
+        # the window is built on the first "Show"
+        self.background = '--minimized' in sys.argv
+        self.ui_built = False
+        if self.background:
+            self.root.withdraw()
         
-        # Initialize pygame for sounds
-        pygame.mixer.init()
+        # The mixer starts on first use, and never if sounds are disabled
+        self.audio = SoundPlayer(self.SOUNDS)
+        
+        # Notifications and sounds are delivered off the Tk thread
+        self.alerts = AlertDispatcher(timeout=self.ALERT_TIMEOUT_S, rate_limits=self.ALERT_RATE_LIMITS)
+        self._alert_poll_id = None
         
         # Initialize variables
-        self.tasks = []
+        self.store = TaskStore()
         self.categories = ["Work", "Personal", "Shopping", "Health", "Other"]
         self.priorities = ["Low", "Normal", "Medium", "High", "Urgent"]
         self.current_theme = "light"
         self.snooze_times = [5, 10, 15, 30, 60]  # minutes
-        self.active_reminders = {}
-        self.next_task_id = 1  # Add counter for task IDs
+        # Reminders waiting for the user, shown together in one window
+        self.reminder_inbox = {}  # task id -> reminder id
+        self.reminder_center = None
+        self._pending_reminders = []
+        self._reminder_flush_id = None
+        # One timer for the earliest reminder, rescheduled as tasks change
+        self.reminders = ReminderSchedule()
+        self._reminder_after_id = None
+        self._reminder_reschedule_id = None
+        self.store.subscribe(self.on_reminder_change)
         self.notification_enabled = True  # Add this line
         self.selected_date = datetime.now().strftime("%Y-%m-%d")  # Add default selected date
         
@@ -134,6 +471,52 @@ class TaskReminder:
         
         # Load settings
         self.load_settings()
+        self._sounds_preloaded = False  # See preload_sounds
+        
+        # Persist every store mutation through the configured backend
+        self.storage = open_storage(self.settings.get('storage', 'json'))
+        self.startup.mark("settings")
+        self.store.subscribe(self.storage.record)
+        self._save_after_id = None
+        self._save_poll_id = None
+        self._search_after_id = None
+        self._last_search = None  # (query, store version, ranked ids)
+        self._row_search = ""  # Search text the main list rows highlight
+        self._row_now = datetime.now()  # Overdue cutoff for main list rows
+        self._row_cache = {}  # (view, task id) -> (cache key, row), see cached_row
+        self._sort_columns = []  # Main list sort as (column, descending), primary first
+        self.store.subscribe(self.forget_rows)
+        # Views re-render from store changes instead of being refreshed by hand
+        self.views = ViewUpdates(self.root)
+        self.store.subscribe(self.views.on_change)
+        self.backups = BackupManager()
+        self._backup_thread = None
+        
+        if not self.background:
+            self.build_ui()
+            self.startup.mark("UI build")
+        
+        # Now load tasks after UI elements are created
+        self.load_tasks()
+        self.startup.mark("load_tasks")
+        
+        # Start background processes
+        self.check_reminders()
+        # The first tick waits a full interval, so startup never compacts
+        self.schedule_auto_save()
+
+        # Add system tray icon once the main list is up
+        self.root.after_idle(self.create_system_tray)
+        
+        # Closing the window goes through quit_app so pending saves are flushed
+        self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
+        self.startup.mark("timers")
+        if self.background:
+            self.startup.print()
+
+    def build_ui(self):
+        """Create the main window's widgets"""
+        self.root.set_theme("arc")
         
         # Create main container first
         self.create_main_container()
@@ -142,25 +525,14 @@ class TaskReminder:
         self.create_toolbar()
         self.create_split_view()
         self.create_status_bar()
-        
-        # Now load tasks after UI elements are created
-        self.load_tasks()
-        
-        # Start background processes
-        self.check_reminders()
-        self.auto_save_timer()
+        self.views.register('tree', self.render_task_list, lambda: self.tab_visible(self.tasks_frame))
+        self.views.register('today', self.render_today, lambda: self.tab_visible(self.today_frame))
+        self.root.bind('<Map>', self.on_map, add='+')
 
         # Add style configuration
         self.style = ttk.Style()
-        self.style = ttk.Style()
         self.configure_styles()
-
-        # Add system tray icon
-        self.create_system_tray()
-        
-        # Check if started from startup
-        if '--minimized' in sys.argv:
-            self.root.iconify()
+        self.ui_built = True
 
     def set_window_icon(self, window):
         """Set icon for any window"""
@@ -188,7 +560,7 @@ class TaskReminder:
         file_menu.add_command(label="Import Tasks", command=self.import_tasks)
         file_menu.add_command(label="Export Tasks", command=self.export_tasks)
         file_menu.add_separator()
-        file_menu.add_command(label="Exit", command=self.root.quit)
+        file_menu.add_command(label="Exit", command=self.quit_app)
         
         # Edit menu
         edit_menu = tk.Menu(menubar, tearoff=0)
@@ -206,6 +578,7 @@ class TaskReminder:
         menubar.add_cascade(label="Tools", menu=tools_menu)
         tools_menu.add_command(label="Statistics", command=self.show_statistics)
         tools_menu.add_command(label="Backup Data", command=self.backup_data)
+        tools_menu.add_command(label="Restore Backup", command=self.show_restore_dialog)
 
     def create_toolbar(self):
         toolbar = ttk.Frame(self.main_container)
@@ -317,12 +690,35 @@ class TaskReminder:
         # Calendar view
         self.calendar_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.calendar_frame, text="Calendar")
-        self.create_calendar_view()
         
         # Statistics view
         self.stats_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.stats_frame, text="Statistics")
-        self.create_statistics_view()
+        
+        # The calendar and statistics tabs are built the first time they are opened
+        self._tab_builders = {
+            str(self.calendar_frame): self.create_calendar_view,
+            str(self.stats_frame): self.create_statistics_view,
+        }
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+
+    def on_tab_changed(self, event=None):
+        """Build and fill a lazily created tab when it is first selected"""
+        builder = self._tab_builders.pop(self.notebook.select(), None)
+        if builder is not None:
+            builder()
+        # Catch up on changes made while the tab was hidden
+        self.views.flush()
+
+    def tab_visible(self, frame):
+        """True when frame's notebook tab is selected and the window is shown"""
+        return (self.root.state() not in ('iconic', 'withdrawn')
+                and self.notebook.select() == str(frame))
+
+    def on_map(self, event):
+        """Window restored: render views that changed while it was hidden"""
+        if event.widget is self.root:
+            self.views.flush()
 
     def create_today_tasks_view(self):
         """Create the today tasks view"""
@@ -343,6 +739,7 @@ class TaskReminder:
         # Tasks list
         columns = ("Task", "Time", "Category", "Priority", "Status")
         self.today_tree = ttk.Treeview(container, columns=columns, show="headings")
+        self.today_rows = TreeRows(self.today_tree)
         
         # Configure columns
         self.today_tree.heading("Task", text="Task")
@@ -384,10 +781,6 @@ class TaskReminder:
         """Update the today tasks list using the main filtering system"""
         print("\nDEBUG: Starting update_today_tasks")
         
-        # Clear current items
-        for item in self.today_tree.get_children():
-            self.today_tree.delete(item)
-        
         # Store current filter settings
         old_category = self.category_var.get()
         old_priority = self.priority_var.get()
@@ -411,6 +804,7 @@ class TaskReminder:
             
             if not today_tasks:
                 print("DEBUG: No tasks found for today")
+                self.today_rows.reconcile([])
                 self.no_tasks_label.configure(
                     text="No pending tasks for today\nClick 'New Task' at the top to create one"
                 )
@@ -418,56 +812,21 @@ class TaskReminder:
             else:
                 self.no_tasks_label.pack_forget()
                 
-                # Fix the priority sorting order
-                priority_order = {"Low": 0, "Normal": 1, "Medium": 2, "High": 3, "Urgent": 4}
-                
-                # Update sort key to use priority_order
+                # Sort by due time, then priority rank
+                # Only tasks with a valid due date pass the Today filter
                 today_tasks.sort(key=lambda x: (
-                    datetime.strptime(x['due_date'], "%Y-%m-%d %H:%M"),
-                    priority_order.get(x.get('priority', 'Normal'), 0)
+                    self.store.due(x),
+                    PRIORITY_RANK.get(x.get('priority', 'Normal'), 0)
                 ))
                 
-                # Add tasks to the tree view
-                for task in today_tasks:
-                    print(f"DEBUG: Adding task to today view: {task['name']} - {task['due_date']}")
-                    task_datetime = datetime.strptime(task['due_date'], "%Y-%m-%d %H:%M")
-                    task_time = task_datetime.strftime("%H:%M")
-                    
-                    # Add status indicator emoji
-                    display_name = task['name']
-                    if datetime.now() > task_datetime:
-                        display_name = "⚠️ " + display_name  # Overdue
-                    elif task.get('reminder_enabled'):
-                        display_name = "⏰ " + display_name  # Has reminder
-                    
-                    item_id = self.today_tree.insert(
-                        "", "end",
-                        values=(
-                            display_name,
-                            task_time,
-                            task.get('category', 'Other'),
-                            task.get('priority', 'Normal'),
-                            task.get('status', 'Pending')
-                        ),
-                        tags=(task.get('priority', 'Normal'),)
-                    )
-                    
-                    # Apply priority color
-                    if task.get('priority') in self.priority_colors:
-                        self.today_tree.tag_configure(
-                            task.get('priority'),
-                            foreground=self.priority_colors[task.get('priority')]
-                        )
-                    
-                    # Highlight overdue tasks
-                    if datetime.now() > task_datetime:
-                        self.today_tree.tag_configure(
-                            f"overdue_{item_id}",
-                            background="#FFE6E6"
-                        )
-                        current_tags = list(self.today_tree.item(item_id, "tags"))
-                        current_tags.append(f"overdue_{item_id}")
-                        self.today_tree.item(item_id, tags=current_tags)
+                # Apply priority colors and overdue highlighting
+                for priority, color in self.priority_colors.items():
+                    self.today_tree.tag_configure(priority, foreground=color)
+                self.today_tree.tag_configure("overdue", background="#FFE6E6")
+                
+                # Only rows that changed since the last update touch the tree
+                now = datetime.now()
+                self.today_rows.reconcile([self.today_row(task, now) for task in today_tasks])
 
         except Exception as e:
             print(f"DEBUG: Error in update_today_tasks: {e}")
@@ -480,9 +839,16 @@ class TaskReminder:
             self.priority_var.set(old_priority)
             self.status_var.set(old_status)
             self.due_date_var.set(old_due)
-        
-        # Update statistics
-        self.update_statistics()
+
+    def render_today(self, changes):
+        """ViewUpdates callback for the Today tab"""
+        if changes is not None and not any(
+            fields is None or 'due_date' in fields or 'status' in fields
+            or str(task_id) in self.today_rows
+            for task_id, fields in changes.items()
+        ):
+            return
+        self.update_today_tasks()
 
     def create_task_list_frame(self):
         left_frame = ttk.Frame(self.paned_window)
@@ -501,15 +867,19 @@ class TaskReminder:
             self.tree.column(col, width=100)
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(left_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(left_frame, orient=tk.VERTICAL)
         
         # Pack
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Only the visible rows exist as Treeview items; the virtual list
+        # drives the scrollbar and owns the selection
+        self.task_list = VirtualTreeview(self.tree, scrollbar, self.task_row,
+                                         on_select=self.on_task_select)
+        
         # Bindings
-        self.tree.bind('<<TreeviewSelect>>', self.on_task_select)
+        self.tree.bind('<Shift-Button-1>', self.on_heading_shift_click)
         self.tree.bind('<Double-1>', self.edit_task)
         self.tree.bind('<Delete>', self.delete_task)
 
@@ -627,7 +997,7 @@ class TaskReminder:
         calendar_left.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Calendar widget
-        self.cal = Calendar(calendar_left, selectmode='day',
+        self.cal = calendar_widget(calendar_left, selectmode='day',
                           year=datetime.now().year,
                           month=datetime.now().month,
                           day=datetime.now().day)
@@ -649,6 +1019,7 @@ class TaskReminder:
                                          columns=columns, 
                                          show="headings",
                                          height=15)
+        self.cal_rows = TreeRows(self.cal_task_list)
         
         # Configure columns
         self.cal_task_list.heading("Time", text="Time")
@@ -676,6 +1047,7 @@ class TaskReminder:
         
         # Update tasks for current date
         self.update_calendar_tasks()
+        self.views.register('calendar', self.render_calendar, lambda: self.tab_visible(self.calendar_frame))
 
     def create_statistics_view(self):
         """Create an enhanced statistics view using grid layout"""
@@ -716,6 +1088,8 @@ class TaskReminder:
             'priority': {},
             'status': {}
         }
+        self.stats_rows = {}  # section -> TreeRows of its Treeview
+        self._stats_shown = {}  # Overview label -> text last written
         
         # Create initial labels
         self.create_stats_section(overview_frame, 'overview')
@@ -725,6 +1099,7 @@ class TaskReminder:
         
         # Update statistics
         self.update_statistics()
+        self.views.register('stats', self.render_statistics, lambda: self.tab_visible(self.stats_frame))
 
     def create_stats_section(self, parent, section):
         """Create labels for a statistics section"""
@@ -761,6 +1136,7 @@ class TaskReminder:
             parent.grid_rowconfigure(0, weight=1)
             
             self.stats_labels[section] = tree
+            self.stats_rows[section] = TreeRows(tree)
 
     def update_statistics(self):
         """Update statistics display with enhanced visualization"""
@@ -778,106 +1154,160 @@ class TaskReminder:
         }
         
         for label, value in overview_data.items():
-            if label in self.stats_labels['overview']:
+            if label in self.stats_labels['overview'] and self._stats_shown.get(label) != value:
                 self.stats_labels['overview'][label].config(text=value)
+                self._stats_shown[label] = value
         
-        # Update Category section
-        category_tree = self.stats_labels['category']
-        category_tree.delete(*category_tree.get_children())
+        # Only rows whose count or percentage changed touch the Treeviews
         total = stats['total'] or 1  # Avoid division by zero
-        for cat, count in stats['by_category'].items():
-            percentage = (count / total) * 100
-            category_tree.insert('', 'end', values=(cat, count, f"{percentage:.1f}%"))
-        
-        # Update Priority section
-        priority_tree = self.stats_labels['priority']
-        priority_tree.delete(*priority_tree.get_children())
-        for pri, count in stats['by_priority'].items():
-            percentage = (count / total) * 100
-            priority_tree.insert('', 'end', values=(pri, count, f"{percentage:.1f}%"))
-        
-        # Update Status section
-        status_tree = self.stats_labels['status']
-        status_tree.delete(*status_tree.get_children())
         status_data = {
             'Completed': stats['completed'],
             'Pending': stats['pending']
         }
-        for status, count in status_data.items():
-            percentage = (count / total) * 100
-            status_tree.insert('', 'end', values=(status, count, f"{percentage:.1f}%"))
-
-    def show_snooze_dialog(self, task_id):
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Snooze Reminder")
-        dialog.geometry("300x200")
-        self.set_window_icon(dialog)  # Add icon
-        
-        ttk.Label(dialog, text="Snooze for:").pack(pady=10)
-        
-        for time in self.snooze_times:
-            ttk.Button(
-                dialog,
-                text=f"{time} minutes",
-                command=lambda t=time: self.snooze_reminder(task_id, t, dialog)
-            ).pack(pady=5)
-        
-        ttk.Button(dialog, text="Dismiss", command=dialog.destroy).pack(pady=10)
-
-    def snooze_reminder(self, task_id, minutes, dialog):
-        # Update next reminder time
-        for task in self.tasks:
-            if task.get('id') == task_id:
-                task['next_reminder'] = (datetime.now() + timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M")
-                break
-        
-        self.save_tasks()
-        dialog.destroy()
+        sections = {
+            'category': stats['by_category'],
+            'priority': stats['by_priority'],
+            'status': status_data,
+        }
+        for section, counts in sections.items():
+            # Item ids are namespaced: an empty value must not become the
+            # Treeview root item ''
+            self.stats_rows[section].reconcile([
+                (f"{section}:{item}",
+                 (item if item not in (None, '') else "(none)", count, f"{(count / total) * 100:.1f}%"),
+                 ())
+                for item, count in counts.items()
+            ])
 
     def play_reminder_sound(self):
-        """Play reminder sound if available"""
-        try:
-            # Try system beep first as it's more reliable
+        """Play reminder sound if available, without blocking the UI"""
+        self.send_alert('sound', self._play_sound)
+
+    def _play_sound(self):
+        """Play the reminder sound; runs on an alert worker thread"""
+        if self.audio.play('reminder'):
+            return
+        # Fall back to a system beep when there is no sound file or mixer;
+        # elsewhere having no sound is not an error
+        if sys.platform == 'win32':
             import winsound
             winsound.Beep(1000, 500)  # frequency=1000Hz, duration=500ms
-        except Exception as e:
-            try:
-                # Fallback to pygame if system beep fails
-                sound_file = 'reminder.wav'
-                if os.path.exists(sound_file):
-                    pygame.mixer.music.load(sound_file)
-                    pygame.mixer.music.play()
-            except Exception as e:
-                print(f"Error playing sound: {e}")
 
     def import_tasks(self):
         filename = filedialog.askopenfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=[("JSON files", "*.json"), ("NDJSON files", "*.ndjson *.jsonl"),
+                       ("CSV files", "*.csv"), ("All files", "*.*")]
         )
-        if filename:
+        if not filename:
+            return
+        
+        # Progress window
+        progress_window = tk.Toplevel(self.root)
+        progress_window.title("Importing Tasks")
+        progress_window.geometry("400x100")
+        self.set_window_icon(progress_window)  # Add icon
+        progress_label = ttk.Label(progress_window, text="Reading tasks...")
+        progress_label.pack(pady=10)
+        progress_bar = ttk.Progressbar(progress_window, mode='determinate', maximum=100)
+        progress_bar.pack(fill=tk.X, padx=10, pady=5)
+        
+        # Parse, validate and dedupe on a worker thread against a snapshot
+        existing = self.store.snapshot()
+        state = {'done': 0, 'total': 1}
+        
+        def progress(done, total):
+            state['done'], state['total'] = done, total
+        
+        def run():
             try:
-                with open(filename, 'r') as f:
-                    imported_tasks = json.load(f)
-                self.tasks.extend(imported_tasks)
-                self.save_tasks()
-                self.refresh_task_list()
-                messagebox.showinfo("Success", "Tasks imported successfully!")
+                state['result'] = load_import(filename, existing, progress=progress)
             except Exception as e:
-                messagebox.showerror("Error", f"Error importing tasks: {str(e)}")
+                state['error'] = e
+        
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        
+        def check():
+            progress_bar['value'] = state['done'] * 100 / max(state['total'], 1)
+            if worker.is_alive():
+                self.root.after(100, check)
+                return
+            progress_window.destroy()
+            if 'error' in state:
+                messagebox.showerror("Error", f"Error importing tasks: {str(state['error'])}")
+                return
+            self.commit_import(state['result'])
+        
+        self.root.after(100, check)
+
+    def commit_import(self, result):
+        """Add imported tasks to the store in one batch and save once"""
+        with self.storage.batch():
+            # Colliding ids are remapped to fresh ones in the same pass
+            remapped = self.store.add_many(result['tasks'])
+        self.request_save()
+        
+        summary = (f"Imported {len(result['tasks'])} tasks.\n"
+                   f"Skipped {result['duplicates']} duplicates.\n"
+                   f"Gave {remapped} tasks new ids.")
+        if result['errors']:
+            summary += f"\n\nSkipped {len(result['errors'])} invalid records:\n"
+            summary += "\n".join(f"{where}: {message}" for where, message in result['errors'][:10])
+        messagebox.showinfo("Import Complete", summary)
+
+    def filters_active(self):
+        """True when any toolbar filter or the search box is set"""
+        return (any(var.get() != "All" for var in (
+                    self.category_var, self.priority_var,
+                    self.status_var, self.due_date_var))
+                or bool(self.search_var.get()))
 
     def export_tasks(self):
+        tasks = self.store.all()
+        if self.filters_active():
+            filtered = self.filter_tasks()
+            choice = messagebox.askyesnocancel(
+                "Export Tasks",
+                f"Export only the {len(filtered)} tasks matching the current filters?\n"
+                f"Choose No to export all {len(tasks)} tasks."
+            )
+            if choice is None:
+                return
+            if choice:
+                tasks = filtered
+        
         filename = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=[("JSON files", "*.json"), ("NDJSON files", "*.ndjson"),
+                       ("CSV files", "*.csv"), ("All files", "*.*")]
         )
-        if filename:
+        if not filename:
+            return
+        
+        # Copy on the Tk thread, write rows on a worker thread
+        snapshot = [dict(task) for task in tasks]
+        state = {}
+        
+        def run():
             try:
-                with open(filename, 'w') as f:
-                    json.dump(self.tasks, f, indent=4)
-                messagebox.showinfo("Success", "Tasks exported successfully!")
+                state['count'] = export_tasks(filename, snapshot)
             except Exception as e:
-                messagebox.showerror("Error", f"Error exporting tasks: {str(e)}")
+                state['error'] = e
+        
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        self.status_bar.config(text=f"Exporting {len(snapshot)} tasks...")
+        
+        def check():
+            if worker.is_alive():
+                self.root.after(100, check)
+            elif 'error' in state:
+                messagebox.showerror("Error", f"Error exporting tasks: {str(state['error'])}")
+            else:
+                self.status_bar.config(text=f"Exported {state['count']} tasks to {filename}")
+        
+        self.root.after(100, check)
 
     def show_preferences(self):
         pref_window = tk.Toplevel(self.root)
@@ -916,6 +1346,12 @@ class TaskReminder:
         ttk.Label(autosave_frame, text="Auto-save interval (minutes):").pack()
         ttk.Entry(autosave_frame, textvariable=self.autosave_interval).pack(padx=5, pady=5)
         
+        # Storage backend
+        self.storage_mode = tk.StringVar(value=self.settings.get('storage', 'json'))
+        ttk.Label(autosave_frame, text="Storage mode (applies after restart):").pack()
+        ttk.Combobox(autosave_frame, textvariable=self.storage_mode,
+                     values=["json", "journal", "binary", "sqlite"], state="readonly").pack(padx=5, pady=5)
+        
         # Save button
         ttk.Button(pref_window, text="Save Preferences", command=lambda: self.save_preferences(pref_window)).pack(pady=10)
 
@@ -924,6 +1360,7 @@ class TaskReminder:
         self.settings['notification_enabled'] = self.notification_enabled.get()
         self.settings['default_reminder'] = self.default_reminder_time.get()
         self.settings['autosave_interval'] = self.autosave_interval.get()
+        self.settings['storage'] = self.storage_mode.get()
         
         with open('settings.json', 'w') as f:
             json.dump(self.settings, f)
@@ -949,7 +1386,7 @@ class TaskReminder:
         self.set_window_icon(cal_window)  # Add icon
         
         # Create calendar widget
-        cal = Calendar(cal_window, selectmode='day',
+        cal = calendar_widget(cal_window, selectmode='day',
                       year=datetime.now().year,
                       month=datetime.now().month,
                       day=datetime.now().day)
@@ -969,11 +1406,10 @@ class TaskReminder:
             for item in task_list.get_children():
                 task_list.delete(item)
             # Add tasks for selected date
-            for task in self.tasks:
-                if task['due_date'].startswith(selected_date):
-                    task_list.insert("", "end", values=(task['name'],
-                                                      task['due_date'],
-                                                      task.get('priority', 'Normal')))
+            for task in self.tasks_due_on(selected_date):
+                task_list.insert("", "end", iid=TaskStore.iid(task), values=(task['name'],
+                                                  task['due_date'],
+                                                  task.get('priority', 'Normal')))
         
         cal.bind('<<CalendarSelected>>', update_tasks)
 
@@ -1012,40 +1448,116 @@ class TaskReminder:
         """Calculate various statistics about tasks"""
         stats = {}
         
-        # Basic counts
-        stats['total'] = len(self.tasks)
-        stats['completed'] = len([t for t in self.tasks if t.get('status') == 'Completed'])
+        # Basic counts, straight from the store's facet indexes
+        stats['total'] = len(self.store)
+        stats['completed'] = self.store.facet_counts('status').get('Completed', 0)
         stats['pending'] = stats['total'] - stats['completed']
         stats['completion_rate'] = (stats['completed'] / stats['total'] * 100) if stats['total'] > 0 else 0
         
         # Category statistics
         stats['by_category'] = {}
-        for task in self.tasks:
-            category = task.get('category', 'Other')
-            stats['by_category'][category] = stats['by_category'].get(category, 0) + 1
+        for category, count in self.store.facet_counts('category').items():
+            category = category if category is not None else 'Other'
+            stats['by_category'][category] = stats['by_category'].get(category, 0) + count
         
         # Priority statistics
-        stats['by_priority'] = {}
-        for task in self.tasks:
-            priority = task.get('priority', 'Normal')
-            stats['by_priority'][priority] = stats['by_priority'].get(priority, 0) + 1
+        stats['by_priority'] = self.store.facet_counts('priority')
         
         return stats
 
     def backup_data(self):
-        backup_dir = "backups"
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
+        """Create an incremental backup and thin old ones on a worker thread"""
+        if self._backup_thread is not None and self._backup_thread.is_alive():
+            self.status_bar.config(text="A backup is already running")
+            return
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = os.path.join(backup_dir, f"tasks_backup_{timestamp}.json")
+        tasks = self.store.snapshot()
+        retention = self.settings.get('backup_retention', DEFAULT_RETENTION)
+        result = {}
         
-        try:
-            with open(backup_file, 'w') as f:
-                json.dump(self.tasks, f, indent=4)
-            self.status_bar.config(text=f"Backup created: {backup_file}")
-        except Exception as e:
-            messagebox.showerror("Backup Error", f"Error creating backup: {str(e)}")
+        def run():
+            try:
+                result['name'] = self.backups.create(tasks)
+                result['thinned'] = self.backups.thin(retention)
+            except Exception as e:
+                result['error'] = e
+        
+        def check():
+            if self._backup_thread.is_alive():
+                self.root.after(100, check)
+            elif 'error' in result:
+                messagebox.showerror("Backup Error", f"Error creating backup: {str(result['error'])}")
+            else:
+                self.status_bar.config(
+                    text=f"Backup created: {result['name']} "
+                         f"({len(result['thinned'])} old backups removed)"
+                )
+        
+        self.status_bar.config(text="Creating backup...")
+        self._backup_thread = threading.Thread(target=run, daemon=True)
+        self._backup_thread.start()
+        self.root.after(100, check)
+
+    def show_restore_dialog(self):
+        """Let the user pick a backup and restore all tasks from it"""
+        if self._backup_thread is not None and self._backup_thread.is_alive():
+            self.status_bar.config(text="Please wait for the running backup to finish")
+            return
+        
+        names = self.backups.list_backups()
+        if not names:
+            messagebox.showinfo("Restore Backup", "No backups found")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Restore Backup")
+        dialog.geometry("300x400")
+        self.set_window_icon(dialog)  # Add icon
+        
+        ttk.Label(dialog, text="Select a backup:").pack(pady=5)
+        backup_list = tk.Listbox(dialog)
+        backup_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        # Newest first
+        names.reverse()
+        for name in names:
+            created = datetime.strptime(name, "%Y%m%d_%H%M%S_%f")
+            backup_list.insert(tk.END, created.strftime("%Y-%m-%d %H:%M:%S"))
+        
+        def restore():
+            selection = backup_list.curselection()
+            if not selection:
+                return
+            name = names[selection[0]]
+            label = backup_list.get(selection[0])
+            if not messagebox.askyesno("Confirm Restore", 
+                                       f"Replace all current tasks with the backup from {label}?"):
+                return
+            
+            try:
+                # Keep the current state restorable too
+                self.backups.create(self.store.snapshot())
+                tasks = self.backups.restore(name)
+            except Exception as e:
+                messagebox.showerror("Restore Error", f"Error restoring backup: {str(e)}")
+                return
+            
+            self.store.load(tasks)
+            # A queued save of the old tasks must not overwrite the restore
+            self.saver.flush()
+            self.compact_storage(force=True)
+            self.saver.mark_saved(self.store.version)
+            self.reset_reminders()
+            self.check_reminders()
+            
+            dialog.destroy()
+            # The store was replaced wholesale, without change events
+            self.views.invalidate()
+            self.status_bar.config(text=f"Restored {len(tasks)} tasks from backup {label}")
+        
+        CustomStyle.create_styled_button(
+            dialog, "Restore", restore, "save"
+        ).pack(pady=10)
 
     def quick_add_task(self):
         dialog = tk.Toplevel(self.root)
@@ -1066,9 +1578,10 @@ class TaskReminder:
             name = name_entry.get()
             date = date_entry.get()
             
-            if name and date:
+            if name and date and parse_due(date) is None:
+                messagebox.showwarning("Invalid Date", "Please enter the due date as YYYY-MM-DD HH:MM")
+            elif name and date:
                 task = {
-                    "id": self.next_task_id,
                     "name": name,
                     "due_date": date,
                     "status": "Pending",
@@ -1079,10 +1592,8 @@ class TaskReminder:
                     "reminder_time": "15 min"  # Add default reminder time
                 }
                 
-                self.next_task_id += 1
-                self.tasks.append(task)
-                self.save_tasks()
-                self.refresh_task_list()
+                self.store.add(task)
+                self.request_save()
                 dialog.destroy()
             else:
                 messagebox.showwarning("Invalid Input", "Please fill in all fields")
@@ -1091,7 +1602,11 @@ class TaskReminder:
 
     def share_task(self):
         """Enhanced share functionality with multiple options"""
-        selected_items = self.tree.selection()
+        import urllib.parse
+        import webbrowser
+        import pyperclip
+        
+        selected_items = self.task_list.selection()
         if not selected_items:
             return
         
@@ -1170,11 +1685,26 @@ Notes: {task.get('notes', '')}
             share_window.grab_set()
             self.root.wait_window(share_window)
 
-    def auto_save_timer(self):
-        self.save_tasks()
+    def schedule_auto_save(self):
         interval = int(self.settings.get('autosave_interval', 5)) * 60 * 1000  # Convert to milliseconds
         self.root.after(interval, self.auto_save_timer)
 
+    def auto_save_timer(self):
+        # Write anything still pending; does nothing when there are no changes
+        self.save_tasks()
+        # Journal storage rewrites its snapshot here when it has new records;
+        # otherwise no snapshot is taken, so lazily loaded tasks stay undecoded
+        if self.storage.needs_compact():
+            self.compact_storage()
+        self.schedule_auto_save()
+
+    def compact_storage(self, force=False):
+        """Compact the storage, keeping lazily loaded tasks undecoded"""
+        if hasattr(self.storage, 'compact_store'):
+            self.storage.compact_store(self.store, force)
+        else:
+            self.storage.compact(self.store.snapshot(), force)
+
     def load_settings(self):
         try:
             with open('settings.json', 'r') as f:
@@ -1194,161 +1724,323 @@ Notes: {task.get('notes', '')}
             json.dump(self.settings, f)
 
     def load_tasks(self):
-        """Load tasks from JSON file"""
+        """Load tasks through the storage backend"""
         try:
-            with open('tasks.json', 'r') as f:
-                self.tasks = json.load(f)
-                print(f"\nDEBUG: Loaded {len(self.tasks)} tasks from file")
-                
-                # Ensure all tasks have IDs
-                max_id = 0
-                for task in self.tasks:
-                    if 'id' not in task:
-                        max_id += 1
-                        task['id'] = max_id
-                    else:
-                        max_id = max(max_id, task['id'])
-                    print(f"DEBUG: Task loaded - Name: {task['name']}, Due: {task['due_date']}, Status: {task.get('status')}")
-                self.next_task_id = max_id + 1
-                
-                # Initial refresh of all views
-                self.refresh_task_list()
-                self.update_today_tasks()
-                
-        except FileNotFoundError:
-            print("DEBUG: No tasks.json file found, starting with empty task list")
-            self.tasks = []
-        except json.JSONDecodeError as e:
-            print(f"DEBUG: Error decoding tasks.json: {e}")
-            self.tasks = []
+            if getattr(self.storage, 'lazy', False):
+                # Completed tasks stay in the mapped snapshot until needed
+                self.store.load_snapshot(*self.storage.open_snapshot())
+                reassigned = 0
+            else:
+                # The store assigns ids to tasks that are missing one
+                reassigned = self.store.load(self.storage.load())
+            print(f"\nDEBUG: Loaded {len(self.store)} tasks from storage")
+            if reassigned:
+                # Persist the new ids so they stay stable across restarts
+                self.compact_storage(force=True)
+        except StorageError as e:
+            print(f"DEBUG: Error loading tasks: {e}")
+            messagebox.showwarning("Load Error", str(e))
+            self.store.load([])
         except Exception as e:
             print(f"DEBUG: Unexpected error loading tasks: {e}")
-            self.tasks = []
+            self.store.load([])
+        
+        if getattr(self.storage, 'recovered_tail', False):
+            print("DEBUG: Recovered tasks from an incomplete journal write")
+            if self.ui_built:
+                self.status_bar.config(text="Recovered tasks from an incomplete journal write")
+        
+        # Whatever was just loaded is already on disk
+        self.saver = BackgroundSaver(self.storage, saved_version=self.store.version)
+        self.reset_reminders()
+        
+        # Paint the Today tab first; the full list (which needs every task
+        # decoded) follows once the window is up
+        if self.ui_built:
+            self.update_today_tasks()
+            self.root.after_idle(self.first_refresh)
+
+    def first_refresh(self):
+        """Fill the main list once the window is up, then report startup"""
+        self.startup.mark("mainloop start")
+        self.refresh_task_list()
+        self.startup.mark("first refresh")
+        self.startup.print()
+        # Index for search now that the list is painted, not on the first keystroke
+        self.root.after_idle(self.store.build_search)
+
+    def request_save(self):
+        """Schedule a save once mutations have been quiet for SAVE_DELAY_MS"""
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+        self._save_after_id = self.root.after(self.SAVE_DELAY_MS, self.save_tasks)
 
     def save_tasks(self):
-        """Save tasks to JSON file"""
-        with open('tasks.json', 'w') as f:
-            json.dump(self.tasks, f, indent=4)
-        self.status_bar.config(text="Tasks saved successfully")
+        """Hand a snapshot of the tasks to the background saver if anything changed"""
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+            self._save_after_id = None
+        
+        version = self.store.version
+        if not self.saver.is_dirty(version):
+            return
+        
+        # Snapshot on the Tk thread; serialization and I/O happen on the worker.
+        # Backends that already persisted each change need no snapshot.
+        tasks = self.store.snapshot() if self.storage.save_needs_tasks() else None
+        self.saver.submit(version, tasks)
+        self.poll_save_results()
+
+    def poll_save_results(self):
+        """Report finished saves in the status bar"""
+        self._save_poll_id = None
+        while True:
+            try:
+                version, seconds, error = self.saver.results.get_nowait()
+            except queue.Empty:
+                break
+            if error:
+                # Leave the version dirty so the next request retries
+                self.saver.failed(version)
+                print(f"DEBUG: Error saving tasks: {error}")
+                self.status_bar.config(text=f"Error saving tasks: {error}")
+            else:
+                self.status_bar.config(text=f"Tasks saved ({seconds * 1000:.0f} ms)")
+        
+        if self.saver.busy():
+            self._save_poll_id = self.root.after(50, self.poll_save_results)
 
     def refresh_task_list(self):
-        """Update the task list display with colors"""
-        # Clear current items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Update the task list display with colors
+
+        Other views follow task changes on their own, see ViewUpdates.
+        """
+        # This refresh already applies the current search text
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+            self._search_after_id = None
         
-        # Filter tasks based on current filters
-        filtered_tasks = self.filter_tasks()
+        # Filter tasks based on current filters; tasks are only decoded
+        # by task_row as they scroll into view
+        ids = self.filter_ids()
         
         # Configure tags for colors
         for priority, color in self.priority_colors.items():
             self.tree.tag_configure(priority, foreground=color)
-        
-        # Add tasks to tree with colors
-        for task in filtered_tasks:
-            priority = task.get('priority', 'Normal')
-            item_id = self.tree.insert("", "end", 
-                           values=(task['name'],
-                                 task.get('category', 'Other'),
-                                 priority,
-                                 task['due_date'],
-                                 task['status']),
-                           tags=(priority,))
-            
-            # Add overdue highlighting
-            if task['status'] != 'Completed':
-                due_date = datetime.strptime(task['due_date'], "%Y-%m-%d %H:%M")
-                if due_date < datetime.now():
-                    self.tree.tag_configure(f"overdue_{item_id}", background="#FFE6E6")
-                    self.tree.item(item_id, tags=(priority, f"overdue_{item_id}"))
-        
-        # Update statistics after refreshing task list
+        self.tree.tag_configure("search_match", background="#FFF9C4")
+        self.tree.tag_configure("overdue", background="#FFE6E6")
+        
+        # Rows are built by task_row as they scroll into view
+        self._row_search = self.search_var.get().strip()
+        self._row_now = datetime.now()
+        if self._sort_columns:
+            ids = self.store.sort_ids(ids, self.sort_fields())
+        self.task_list.set_rows([str(task_id) for task_id in ids])
+
+    def list_fields(self):
+        """Task fields that decide which tasks the main list shows, and their order"""
+        fields = {'category', 'priority', 'status', 'due_date'}
+        if self.search_var.get().strip():
+            fields.update(SEARCH_FIELDS)
+        for field, _ in self.sort_fields():
+            fields.add('due_date' if field == 'due' else field)
+        return fields
+
+    def render_task_list(self, changes):
+        """ViewUpdates callback for the main list"""
+        if changes is None:
+            self.refresh_task_list()
+            return
+        list_fields = self.list_fields()
+        if any(fields is None or fields & list_fields for fields in changes.values()):
+            # Rows may enter, leave or move
+            self.refresh_task_list()
+        else:
+            # Only the values of the changed rows need redrawing
+            self._row_now = datetime.now()
+            self.task_list.refresh([str(task_id) for task_id in changes])
+
+    def render_calendar(self, changes):
+        """ViewUpdates callback for the Calendar tab"""
+        if changes is not None and not any(
+            fields is None or 'due_date' in fields or str(task_id) in self.cal_rows
+            for task_id, fields in changes.items()
+        ):
+            return
+        self.update_calendar_tasks()
+
+    def render_statistics(self, changes):
+        """ViewUpdates callback for the Statistics tab"""
+        # Edits to other fields leave every count unchanged
+        if changes is not None and not any(
+            fields is None or fields & FACETS.keys() for fields in changes.values()
+        ):
+            return
         self.update_statistics()
-        
-        # Also update calendar view if it exists
-        if hasattr(self, 'cal_task_list'):
-            self.update_calendar_tasks()
+
+    def cached_row(self, view, task, build, *context):
+        """Return build(task), cached until the task or context changes"""
+        key = (self.store.revision(task['id']),) + context
+        cached = self._row_cache.get((view, task['id']))
+        if cached is None or cached[0] != key:
+            cached = (key, build(task))
+            self._row_cache[(view, task['id'])] = cached
+        return cached[1]
+
+    def forget_rows(self, action, task, fields=None):
+        """Store listener: drop cached rows of removed tasks"""
+        if action == 'removed':
+            for view in ('tree', 'today', 'calendar'):
+                self._row_cache.pop((view, task['id']), None)
+
+    def is_overdue(self, task, now):
+        """True for unfinished tasks whose due date has passed"""
+        due_date = self.store.due(task)
+        return task.get('status') != 'Completed' and due_date is not None and due_date < now
+
+    def task_row(self, iid):
+        """Return the main list (values, tags) for a task's item id"""
+        task = self.store.from_iid(iid)
+        if task is None:
+            # A stale id, e.g. after a restore while the list was hidden;
+            # the pending view update replaces the row list
+            return ("", "", "", "", ""), ()
+        search_term = self._row_search
+        overdue = self.is_overdue(task, self._row_now)
+        
+        def build(task):
+            priority = task.get('priority', 'Normal')
+            name = highlight(task['name'], search_term) if search_term else task['name']
+            tags = [priority]
+            if search_term:
+                # Search matches get a highlighted row and marked words
+                tags.append("search_match")
+            if overdue:
+                tags.append("overdue")
+            values = (name, task.get('category', 'Other'), priority, task['due_date'], task['status'])
+            return values, tuple(tags)
+        return self.cached_row('tree', task, build, search_term, overdue)
+
+    def today_row(self, task, now):
+        """Return the Today view (item id, values, tags) for a task"""
+        overdue = self.is_overdue(task, now)
+        
+        def build(task):
+            # Add status indicator emoji
+            display_name = task['name']
+            if overdue:
+                display_name = "⚠️ " + display_name  # Overdue
+            elif task.get('reminder_enabled'):
+                display_name = "⏰ " + display_name  # Has reminder
+            priority = task.get('priority', 'Normal')
+            values = (
+                display_name,
+                self.store.due(task).strftime("%H:%M"),
+                task.get('category', 'Other'),
+                priority,
+                task.get('status', 'Pending')
+            )
+            tags = (priority, "overdue") if overdue else (priority,)
+            return TaskStore.iid(task), values, tags
+        return self.cached_row('today', task, build, overdue)
+
+    def calendar_row(self, task):
+        """Return the calendar list (item id, values, tags) for a task"""
+        def build(task):
+            time = task['due_date'].split()[1]  # Get time part
+            priority = task.get('priority', 'Normal')
+            status = task.get('status', 'Pending')
+            return TaskStore.iid(task), (time, task['name'], priority, status), (priority,)
+        return self.cached_row('calendar', task, build)
 
     def filter_tasks(self):
         """Apply current filters to tasks"""
-        filtered = self.tasks[:]
-        print(f"\nDEBUG: Starting filter_tasks with {len(filtered)} tasks")
+        return [self.store.get(task_id) for task_id in self.filter_ids()]
+
+    def filter_ids(self):
+        """Ids of the tasks passing the current filters, in display order
+
+        Nothing is decoded here, so the main list only decodes the lazily
+        loaded tasks that scroll into view.
+        """
+        # Backends with indexes (SQLite) answer the filters with one query;
+        # text search always uses the store's index, which covers notes too
+        if hasattr(self.storage, 'query') and not self.search_var.get().strip():
+            return self.query_ids()
+        
+        def selected(var):
+            value = var.get()
+            return None if value == "All" else value
         
         try:
-            # Print all tasks for debugging
-            for task in filtered:
-                print(f"DEBUG: Task before filtering - Name: {task['name']}, Due: {task['due_date']}, Status: {task.get('status')}, Priority: {task.get('priority', 'Normal')}")
-            
-            # Category filter
-            if self.category_var.get() != "All":
-                filtered = [t for t in filtered if t.get('category') == self.category_var.get()]
-                print(f"DEBUG: After category filter: {len(filtered)} tasks")
-            
-            # Priority filter
-            if self.priority_var.get() != "All":
-                filtered = [t for t in filtered if t.get('priority', 'Normal') == self.priority_var.get()]
-                print(f"DEBUG: After priority filter: {len(filtered)} tasks")
-            
-            # Status filter
-            if self.status_var.get() != "All":
-                filtered = [t for t in filtered if t.get('status', 'Pending') == self.status_var.get()]
-                print(f"DEBUG: After status filter: {len(filtered)} tasks")
-            
-            # Due date filter
-            if self.due_date_var.get() != "All":
-                today = datetime.now().date()
-                print(f"DEBUG: Today's date: {today}")
-                filtered_by_date = []
-                
-                for task in filtered:
-                    try:
-                        # Parse task date properly
-                        task_datetime = datetime.strptime(task['due_date'], "%Y-%m-%d %H:%M")
-                        task_date = task_datetime.date()
-                        print(f"DEBUG: Checking task: {task['name']} with date {task_date}")
-                        
-                        if self.due_date_var.get() == "Today":
-                            if task_date == today:
-                                filtered_by_date.append(task)
-                                print(f"DEBUG: Added task to today's list: {task['name']}")
-                        elif self.due_date_var.get() == "This Week":
-                            if 0 <= (task_date - today).days <= 7:
-                                filtered_by_date.append(task)
-                        elif self.due_date_var.get() == "This Month":
-                            if task_date.year == today.year and task_date.month == today.month:
-                                filtered_by_date.append(task)
-                    except (ValueError, TypeError) as e:
-                        print(f"DEBUG: Error parsing date for task: {task.get('name')} - {e}")
-                        continue
-                
-                filtered = filtered_by_date
-                print(f"DEBUG: After date filter: {len(filtered)} tasks")
+            # Category, priority and status come from the store's id sets;
+            # only tasks passing all of them are looked at below
+            ids = self.store.matching(
+                category=selected(self.category_var),
+                priority=selected(self.priority_var),
+                status=selected(self.status_var)
+            )
+            print(f"\nDEBUG: {len(ids)} of {len(self.store)} tasks match the toolbar filters")
             
-            # Search filter
-            if self.search_var.get():
-                search_term = self.search_var.get().lower()
-                filtered = [t for t in filtered if search_term in t['name'].lower()]
+            # Due date filter, as a range query over the due date index
+            due_from, due_to = due_bounds(self.due_date_var.get(), datetime.now().date())
+            search_term = self.search_var.get().strip()
+            if search_term:
+                # Ranked full-text matches, best first
+                filtered = [task_id for task_id in self.search_ids(search_term) if task_id in ids]
+                if due_from is not None:
+                    filtered = [
+                        task_id for task_id in filtered
+                        if self.store.due_of(task_id) is not None
+                        and due_from <= self.store.due_of(task_id) < due_to
+                    ]
                 print(f"DEBUG: After search filter: {len(filtered)} tasks")
+            elif due_from is not None:
+                filtered = self.store.due_ids_between(due_from, due_to, ids)
+                print(f"DEBUG: Due {due_from} to {due_to}: {len(filtered)} tasks")
+            else:
+                # List tasks in id (creation) order
+                filtered = sorted(ids)
             
-            # Print remaining tasks after all filters
-            print("DEBUG: Final filtered tasks:")
-            for task in filtered:
-                print(f"DEBUG: Remaining task - Name: {task['name']}, Due: {task['due_date']}, Status: {task.get('status')}, Priority: {task.get('priority', 'Normal')}")
-            
+            print(f"DEBUG: Final filtered tasks: {len(filtered)}")
             return filtered
         except Exception as e:
-            print(f"DEBUG: Error in filter_tasks: {e}")
+            print(f"DEBUG: Error in filter_ids: {e}")
+            return []
+
+    def query_ids(self):
+        """Apply current filters through the storage backend's indexes"""
+        def selected(var):
+            value = var.get()
+            return None if value == "All" else value
+        
+        due_from, due_to = due_range(self.due_date_var.get(), datetime.now().date())
+        try:
+            ids = self.storage.query(
+                category=selected(self.category_var),
+                priority=selected(self.priority_var),
+                status=selected(self.status_var),
+                due_from=due_from,
+                due_to=due_to
+            )
+        except Exception as e:
+            print(f"DEBUG: Error in query_ids: {e}")
+            return []
+        print(f"DEBUG: Query returned {len(ids)} tasks")
+        return [task_id for task_id in ids if task_id in self.store]
+
+    def tasks_due_on(self, date):
+        """Return tasks whose due date falls on the given YYYY-MM-DD date"""
+        try:
+            day = datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
             return []
+        return self.store.due_between(day, day + timedelta(days=1))
 
     def get_task_by_id(self, tree_id):
         """Get task dictionary from tree item ID"""
-        values = self.tree.item(tree_id)['values']
-        if values:
-            # Find task by name and due date (assuming these are unique together)
-            for task in self.tasks:
-                if task['name'] == values[0] and task['due_date'] == values[3]:
-                    return task
-        return None
+        # Tree item ids are the task ids, see TaskStore.iid
+        return self.store.from_iid(tree_id)
 
     def create_main_container(self):
         """Create the main container frame"""
@@ -1375,25 +2067,77 @@ Notes: {task.get('notes', '')}
         )
         self.status_bar.pack(fill=tk.X, padx=5, pady=2)
 
+    def reset_reminders(self):
+        """Rebuild the reminder schedule after the task list was replaced"""
+        # Completed tasks never need a reminder
+        self.reminders.rebuild(self.store.select('Pending'))
+
     def check_reminders(self):
-        """Check for due reminders"""
-        current_time = datetime.now()
-        
-        for task in self.tasks:
-                due_time = datetime.strptime(task['due_date'], "%Y-%m-%d %H:%M")
-                if current_time >= due_time and task.get('id') not in self.active_reminders:
-                    self.show_reminder(task)
-        
-        # Check again in 1 minute
-        self.root.after(60000, self.check_reminders)
+        """Show reminders that are due and set the timer for the next one"""
+        for task_id, reminder_id in self.reminders.pop_due(datetime.now()):
+            task = self.store.get(task_id)
+            if task is not None:
+                print(f"DEBUG: Reminder '{reminder_id}' fired for task {task_id}")
+                self.show_reminder(task, reminder_id)
+        self.schedule_reminders()
+
+    def schedule_reminders(self):
+        """Set a single timer for the earliest pending reminder"""
+        self._reminder_reschedule_id = None
+        if self._reminder_after_id is not None:
+            self.root.after_cancel(self._reminder_after_id)
+            self._reminder_after_id = None
+        
+        next_time = self.reminders.next_time()
+        if next_time is None:
+            return
+        delay_ms = int((next_time - datetime.now()).total_seconds() * 1000) + 1
+        if delay_ms <= self.SOUND_PRELOAD_MS:
+            self.preload_sounds()
+        delay_ms = max(0, min(delay_ms, self.MAX_REMINDER_WAIT_MS))
+        self._reminder_after_id = self.root.after(delay_ms, self.check_reminders)
+
+    def preload_sounds(self):
+        """Start the mixer and decode sounds ahead of the first reminder"""
+        if self._sounds_preloaded or not self.settings.get('sound_enabled', True):
+            return
+        self._sounds_preloaded = True
+        self.alerts.submit('preload', self.audio.preload)
+
+    def on_reminder_change(self, action, task, fields=None):
+        """Store listener: reschedule when a task's reminders change"""
+        if self.reminders.on_change(action, task, fields) and self._reminder_reschedule_id is None:
+            # Many changes in one go (e.g. an import) reschedule once
+            self._reminder_reschedule_id = self.root.after_idle(self.schedule_reminders)
 
     def on_search(self, *args):
-        """Handle search updates"""
+        """Handle search updates once typing pauses for SEARCH_DELAY_MS"""
+        # Each keystroke replaces the pending search run
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(self.SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        """Apply the search box to the main task list"""
+        self._search_after_id = None
         self.refresh_task_list()
 
+    def search_ids(self, query):
+        """Ranked ids of tasks matching query, narrowed from the last search when possible"""
+        within = None
+        if self._last_search is not None:
+            last_query, version, last_ids = self._last_search
+            # A query that extends the last one can only match a subset of
+            # its results, as long as no task changed in between
+            if version == self.store.version and query.startswith(last_query):
+                within = last_ids
+        ids = self.store.search(query, within)
+        self._last_search = (query, self.store.version, ids)
+        return ids
+
     def on_task_select(self, event):
         """Handle task selection in the tree view"""
-        selected_items = self.tree.selection()
+        selected_items = self.task_list.selection()
         if not selected_items:
             return
             
@@ -1423,28 +2167,16 @@ Notes: {task.get('notes', '')}
         if not selected_items:
             return
             
-        # Get the selected task's values
-        values = self.today_tree.item(selected_items[0])['values']
-        if values:
-            # Find the corresponding task
-            task_name = values[0]
-            task_time = values[1]
-            
-            # Get today's date
-            today = datetime.now().strftime("%Y-%m-%d")
-            task_datetime = f"{today} {task_time}"
-            
-            # Find matching task in main task list
-            for task in self.tasks:
-                if task['name'] == task_name and task['due_date'] == task_datetime:
-                    # Switch to main tasks view and select the task
-                    self.notebook.select(1)  # Switch to Tasks tab
-                    self.select_task_in_tree(task)
-                    break
+        # Today rows use the task id as their item id
+        task = self.store.from_iid(selected_items[0])
+        if task:
+            # Switch to main tasks view and select the task
+            self.notebook.select(1)  # Switch to Tasks tab
+            self.select_task_in_tree(task)
 
     def edit_task(self, event):
         """Handle double-click on task item"""
-        selected_items = self.tree.selection()
+        selected_items = self.task_list.selection()
         if not selected_items:
             return
             
@@ -1454,16 +2186,15 @@ Notes: {task.get('notes', '')}
 
     def delete_task(self, event=None):
         """Delete selected task"""
-        selected_items = self.tree.selection()
+        selected_items = self.task_list.selection()
         if not selected_items:
             return
             
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this task?"):
             task = self.get_task_by_id(selected_items[0])
             if task:
-                self.tasks.remove(task)
-                self.save_tasks()
-                self.refresh_task_list()
+                self.store.remove(task['id'])
+                self.request_save()
                 self.status_bar.config(text="Task deleted successfully")
 
     def save_task_details(self):
@@ -1484,23 +2215,21 @@ Notes: {task.get('notes', '')}
         if not task_data['name'] or not task_data['due_date']:
             messagebox.showwarning("Invalid Input", "Please fill in task name and due date")
             return
+        if parse_due(task_data['due_date']) is None:
+            messagebox.showwarning("Invalid Date", "Please enter the due date as YYYY-MM-DD HH:MM")
+            return
         
-        selected_items = self.tree.selection()
+        selected_items = self.task_list.selection()
         
         if selected_items:  # Editing existing task
             task = self.get_task_by_id(selected_items[0])
             if task:
-                task.update(task_data)
+                self.store.update(task['id'], task_data)
         else:  # Creating new task
-            task_data['id'] = self.next_task_id
-            self.next_task_id += 1
-            self.tasks.append(task_data)
-        
-        # Save to file
-        self.save_tasks()
+            self.store.add(task_data)
         
-        # Refresh display
-        self.refresh_task_list()
+        # Save to file; the views follow the store change
+        self.request_save()
         
         # Show success message
         self.status_bar.config(text="Task saved successfully")
@@ -1515,7 +2244,7 @@ Notes: {task.get('notes', '')}
         date_window.title("Select Date")
         self.set_window_icon(date_window)  # Add icon
         
-        cal = Calendar(date_window, selectmode='day',
+        cal = calendar_widget(date_window, selectmode='day',
                       year=datetime.now().year,
                       month=datetime.now().month,
                       day=datetime.now().day)
@@ -1534,76 +2263,243 @@ Notes: {task.get('notes', '')}
         )
         select_btn.pack(pady=5)
 
-    def show_reminder(self, task):
-        """Show reminder dialog for a task"""
-        task_id = task.get('id')
-        if task_id is None:  # If task has no ID, assign one
-            task_id = self.next_task_id
-            task['id'] = task_id
-            self.next_task_id += 1
-            
-        if task_id in self.active_reminders:
+    def show_reminder(self, task, reminder_id='due'):
+        """Queue a reminder for a task; reminders close together are delivered as one"""
+        self._pending_reminders.append((task['id'], reminder_id))
+        if self._reminder_flush_id is None:
+            self._reminder_flush_id = self.root.after(self.REMINDER_COALESCE_MS, self.deliver_reminders)
+
+    def deliver_reminders(self):
+        """Move queued reminders into the inbox with one notification and one sound"""
+        self._reminder_flush_id = None
+        pending, self._pending_reminders = self._pending_reminders, []
+        
+        new_tasks = []
+        for task_id, reminder_id in pending:
+            task = self.store.get(task_id)
+            if task is None or task_id in self.reminder_inbox:
+                continue
+            self.reminder_inbox[task_id] = reminder_id
+            new_tasks.append(task)
+        if not new_tasks:
             return
-            
-        self.active_reminders[task_id] = True
+        print(f"DEBUG: Delivering {len(new_tasks)} reminders")
         
         # Show system notification if enabled
         if self.settings.get('notification_enabled', True):
-            self.show_system_notification(task)
+            if len(new_tasks) == 1:
+                self.show_system_notification(new_tasks[0])
+            else:
+                self.show_digest_notification(new_tasks)
         
         # Play sound if enabled
         if self.settings.get('sound_enabled', True):
             self.play_reminder_sound()
         
-        # Create reminder window
-        reminder = tk.Toplevel(self.root)
-        reminder.title("Task Reminder")
-        reminder.geometry("400x200")
-        self.set_window_icon(reminder)  # Add icon
+        # In tray-only mode the reminder center opens with the window
+        if self.ui_built:
+            self.show_reminder_center()
+
+    def show_reminder_center(self):
+        """Show the reminder inbox, reusing its window if it exists"""
+        if self.reminder_center is not None and self.reminder_center.winfo_exists():
+            self.refresh_reminder_center()
+            self.reminder_center.deiconify()
+            self.reminder_center.lift()
+            self.reminder_center.focus_force()
+            return
         
-        # Bring window to front
-        reminder.lift()
-        reminder.focus_force()
+        window = tk.Toplevel(self.root)
+        window.title("Task Reminders")
+        window.geometry("600x350")
+        self.set_window_icon(window)  # Add icon
+        self.reminder_center = window
         
-        ttk.Label(reminder, text=f"Task: {task['name']}", font=CustomStyle.HEADER_FONT).pack(pady=10)
-        ttk.Label(reminder, text=f"Due: {task['due_date']}").pack(pady=5)
+        self.reminder_center_label = ttk.Label(window, font=CustomStyle.HEADER_FONT)
+        self.reminder_center_label.pack(pady=10)
+        ttk.Label(
+            window, text="Actions apply to the selected reminders, or to all when none are selected"
+        ).pack(pady=2)
+        
+        # Reminder list
+        list_frame = ttk.Frame(window)
+        list_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        columns = ("Task", "Due", "Priority")
+        self.reminder_tree = ttk.Treeview(list_frame, columns=columns, show="headings",
+                                          selectmode="extended")
+        for col in columns:
+            self.reminder_tree.heading(col, text=col)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.reminder_tree.yview)
+        self.reminder_tree.configure(yscrollcommand=scrollbar.set)
+        self.reminder_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.reminder_rows = TreeRows(self.reminder_tree)
         
-        button_frame = ttk.Frame(reminder)
+        button_frame = ttk.Frame(window)
         button_frame.pack(pady=10)
         
         # Complete button
-        complete_btn = CustomStyle.create_styled_button(
-            button_frame, "Complete", 
-            lambda: self.complete_task(task, reminder), "complete"
-        )
-        complete_btn.pack(side=tk.LEFT, padx=5)
+        CustomStyle.create_styled_button(
+            button_frame, "Complete", self.complete_reminders, "complete"
+        ).pack(side=tk.LEFT, padx=5)
         
-        # Snooze button
-        snooze_btn = CustomStyle.create_styled_button(
+        # Snooze button and duration
+        snooze_var = tk.StringVar(value=str(self.snooze_times[0]))
+        CustomStyle.create_styled_button(
             button_frame, "Snooze",
-            lambda: self.show_snooze_dialog(task['id']), "snooze"
-        )
-        snooze_btn.pack(side=tk.LEFT, padx=5)
+            lambda: self.snooze_reminders(int(snooze_var.get())), "snooze"
+        ).pack(side=tk.LEFT, padx=5)
+        ttk.Combobox(button_frame, textvariable=snooze_var, values=self.snooze_times,
+                     state="readonly", width=4).pack(side=tk.LEFT)
+        ttk.Label(button_frame, text="min").pack(side=tk.LEFT, padx=(2, 5))
         
         # Dismiss button
-        dismiss_btn = CustomStyle.create_styled_button(
-            button_frame, "Dismiss",
-            reminder.destroy, "dismiss"
+        CustomStyle.create_styled_button(
+            button_frame, "Dismiss", self.dismiss_reminders, "dismiss"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Closing only hides the window so it can be reused
+        window.protocol("WM_DELETE_WINDOW", window.withdraw)
+        
+        self.refresh_reminder_center()
+        window.lift()
+        window.focus_force()
+
+    def refresh_reminder_center(self):
+        """Update the reminder center list from the inbox"""
+        # Tasks completed or deleted elsewhere no longer need attention
+        for task_id in list(self.reminder_inbox):
+            task = self.store.get(task_id)
+            if task is None or task.get('status') == 'Completed':
+                del self.reminder_inbox[task_id]
+        
+        if self.reminder_center is None or not self.reminder_center.winfo_exists():
+            return
+        if not self.reminder_inbox:
+            self.reminder_center.withdraw()
+        
+        task_ids = self.store.sort_ids(self.reminder_inbox, [('due', False)])
+        tasks = [self.store.get(task_id) for task_id in task_ids]
+        self.reminder_rows.reconcile([
+            (TaskStore.iid(task),
+             (task['name'], task['due_date'], task.get('priority', 'Normal')),
+             (task.get('priority', 'Normal'),))
+            for task in tasks
+        ])
+        for priority, color in self.priority_colors.items():
+            self.reminder_tree.tag_configure(priority, foreground=color)
+        count = len(tasks)
+        self.reminder_center_label.config(text=f"{count} reminder{'s' if count != 1 else ''}")
+
+    def reminder_targets(self):
+        """Task ids the reminder center buttons act on"""
+        selected = self.reminder_tree.selection()
+        if selected:
+            return [int(iid) for iid in selected]
+        return list(self.reminder_inbox)
+
+    def complete_reminders(self):
+        """Mark the targeted reminder tasks as completed"""
+        self.complete_tasks(self.reminder_targets())
+
+    def complete_tasks(self, task_ids):
+        """Mark tasks as completed, drop their reminders and notify once"""
+        tasks = []
+        with self.storage.batch():
+            for task_id in task_ids:
+                task = self.store.get(task_id)
+                if task is None:
+                    continue
+                tasks.append(self.store.update(task_id, {'status': 'Completed'}))
+                self.reminder_inbox.pop(task_id, None)
+        if not tasks:
+            return
+        
+        # Save and refresh
+        self.request_save()
+        self.refresh_reminder_center()
+        if len(tasks) == 1:
+            self.status_bar.config(text=f"Task '{tasks[0]['name']}' marked as completed")
+        else:
+            self.status_bar.config(text=f"{len(tasks)} tasks marked as completed")
+        
+        # Show completion notification
+        if self.settings.get('notification_enabled', True):
+            if len(tasks) == 1:
+                self.notify(f"{self.app_name} - Task Completed",
+                            f"Task '{tasks[0]['name']}' has been completed!", timeout=5)
+            else:
+                names = "\n".join(task['name'] for task in tasks[:3])
+                more = f"\n...and {len(tasks) - 3} more" if len(tasks) > 3 else ""
+                self.notify(f"{self.app_name} - {len(tasks)} Tasks Completed", f"{names}{more}", timeout=5)
+
+    def snooze_reminders(self, minutes):
+        """Remind about the targeted tasks again after the given minutes"""
+        task_ids = self.reminder_targets()
+        next_reminder = (datetime.now() + timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M")
+        with self.storage.batch():
+            for task_id in task_ids:
+                self.store.update(task_id, {'next_reminder': next_reminder})
+                self.reminder_inbox.pop(task_id, None)
+        
+        self.request_save()
+        self.refresh_reminder_center()
+        self.status_bar.config(text=f"Snoozed {len(task_ids)} reminder{'s' if len(task_ids) != 1 else ''} for {minutes} minutes")
+
+    def dismiss_reminders(self):
+        """Remove the targeted reminders from the inbox"""
+        for task_id in self.reminder_targets():
+            self.reminder_inbox.pop(task_id, None)
+        self.refresh_reminder_center()
+
+    def show_digest_notification(self, tasks):
+        """Show one system notification summarizing several reminders"""
+        names = "\n".join(task['name'] for task in tasks[:3])
+        more = f"\n...and {len(tasks) - 3} more" if len(tasks) > 3 else ""
+        self.notify(f"{self.app_name} - {len(tasks)} reminders", f"{names}{more}")
+
+    def notify(self, title, message, timeout=10):
+        """Queue a system notification for the alert workers"""
+        self.send_alert(
+            'notification', send_notification,
+            title=title,
+            message=message,
+            app_icon=self.icon_path,
+            app_name=self.app_name,
+            timeout=timeout,
         )
-        dismiss_btn.pack(side=tk.LEFT, padx=5)
+
+    def send_alert(self, kind, func, *args, **kwargs):
+        """Hand an alert to the dispatcher and watch for its result"""
+        if not self.alerts.submit(kind, func, *args, **kwargs):
+            counts = self.alerts.counters(kind)
+            print(f"DEBUG: Dropped {kind} alert ({counts['rate_limited']} rate limited, "
+                  f"{counts['dropped']} queue full)")
+            return
+        if self._alert_poll_id is None:
+            self._alert_poll_id = self.root.after(100, self.poll_alert_results)
+
+    def poll_alert_results(self):
+        """Report failed notifications and sounds in the status bar"""
+        self._alert_poll_id = None
+        while True:
+            try:
+                kind, seconds, error = self.alerts.results.get_nowait()
+            except queue.Empty:
+                break
+            if error:
+                counts = self.alerts.counters(kind)
+                failures = counts['failed'] + counts['timed_out']
+                print(f"DEBUG: {kind} alert failed after {seconds:.1f}s: {error}")
+                if self.ui_built:
+                    self.status_bar.config(text=f"Could not deliver {kind} ({failures} failures so far): {error}")
+        
+        if self.alerts.busy():
+            self._alert_poll_id = self.root.after(100, self.poll_alert_results)
 
     def show_system_notification(self, task):
         """Show system notification for task reminder"""
-        try:
-            notification.notify(
-                title=self.app_name,  # Use app name instead of default
-                message=f"Task: {task['name']}\nDue: {task['due_date']}",
-                app_icon=self.icon_path,
-                app_name=self.app_name,  # Add this line to set app name
-                timeout=10,
-            )
-        except Exception as e:
-            print(f"Failed to show notification: {e}")
+        self.notify(self.app_name, f"Task: {task['name']}\nDue: {task['due_date']}")
 
     def update_calendar_tasks(self, event=None):
         """Update task list for selected calendar date"""
@@ -1618,26 +2514,12 @@ Notes: {task.get('notes', '')}
         
         self.calendar_date_label.config(text=f"Tasks for {selected_date}")
         
-        # Clear current items
-        for item in self.cal_task_list.get_children():
-            self.cal_task_list.delete(item)
-        
-        # Add tasks for selected date
-        for task in self.tasks:
-            if task['due_date'].startswith(selected_date):
-                time = task['due_date'].split()[1]  # Get time part
-                priority = task.get('priority', 'Normal')
-                status = task.get('status', 'Pending')
-                
-                item_id = self.cal_task_list.insert(
-                    "", "end",
-                    values=(time, task['name'], priority, status)
-                )
-                
-                # Apply priority color
-                if priority in self.priority_colors:
-                    self.cal_task_list.tag_configure(priority, foreground=self.priority_colors[priority])
-                    self.cal_task_list.item(item_id, tags=(priority,))
+        # Apply priority colors
+        for priority, color in self.priority_colors.items():
+            self.cal_task_list.tag_configure(priority, foreground=color)
+        
+        # Show tasks for selected date, touching only rows that changed
+        self.cal_rows.reconcile([self.calendar_row(task) for task in self.tasks_due_on(selected_date)])
         
         # Update display immediately
         self.cal_task_list.update()
@@ -1686,8 +2568,11 @@ Notes: {task.get('notes', '')}
         def save_changes():
             # Get notes text properly
             notes_content = notes_text.get('1.0', 'end-1c')
+            if parse_due(date_entry.get()) is None:
+                messagebox.showwarning("Invalid Date", "Please enter the due date as YYYY-MM-DD HH:MM", parent=dialog)
+                return
             
-            task.update({
+            self.store.update(task['id'], {
                 'name': name_entry.get(),
                 'category': category_combo.get(),
                 'priority': priority_combo.get(),
@@ -1696,8 +2581,7 @@ Notes: {task.get('notes', '')}
                 'notes': notes_content  # Make sure notes are saved
             })
             
-            self.save_tasks()
-            self.refresh_task_list()
+            self.request_save()
             dialog.destroy()
             self.status_bar.config(text="Task updated successfully")
         
@@ -1719,85 +2603,69 @@ Notes: {task.get('notes', '')}
         if not selected_items:
             return
             
-        # Get task details
-        values = self.cal_task_list.item(selected_items[0])['values']
-        if values:
-            selected_date = self.cal.get_date()
-            task_time = values[0]
-            task_name = values[1]
-            
-            # Find task in main task list
-            for task in self.tasks:
-                if (task['name'] == task_name and 
-                    task['due_date'] == f"{selected_date} {task_time}"):
-                    # Switch to tasks view and select the task
-                    self.notebook.select(0)  # Switch to first tab (Tasks)
-                    self.select_task_in_tree(task)
-                    break
+        # Calendar rows use the task id as their item id
+        task = self.store.from_iid(selected_items[0])
+        if task:
+            # Switch to tasks view and select the task
+            self.notebook.select(1)  # Switch to Tasks tab
+            self.select_task_in_tree(task)
 
     def select_task_in_tree(self, task):
         """Select a specific task in the main tree view"""
-        for item in self.tree.get_children():
-            values = self.tree.item(item)['values']
-            if values[0] == task['name'] and values[3] == task['due_date']:
-                self.tree.selection_set(item)
-                self.tree.see(item)
-                self.on_task_select(None)
-                break
+        if self.task_list.select(TaskStore.iid(task)):
+            self.on_task_select(None)
 
-    def sort_tasks(self, column):
-        """Sort tasks by the specified column"""
-        # Get all items from tree
-        items = [(self.tree.set(item, column), item) for item in self.tree.get_children('')]
-        
-        # Store current sorting order
-        if not hasattr(self, '_sort_reverse'):
-            self._sort_reverse = {}
-        self._sort_reverse[column] = not self._sort_reverse.get(column, False)
-        
-        # Sort items
-        items.sort(reverse=self._sort_reverse[column])
+    def sort_tasks(self, column, add=False):
+        """Sort tasks by the specified column
+
+        A plain header click sorts by that column alone, toggling its
+        direction when it already is the sort; with add (Shift+click) the
+        column becomes, or toggles, an extra sort key after the others.
+        """
+        columns = list(self._sort_columns)
+        for index, (col, descending) in enumerate(columns):
+            if col == column:
+                break
+        else:
+            index, descending = None, True
         
-        # Rearrange items in sorted order
-        for index, (_, item) in enumerate(items):
-            self.tree.move(item, '', index)
+        if add:
+            if index is None:
+                columns.append((column, False))
+            else:
+                columns[index] = (column, not descending)
+        elif index == 0 and len(columns) == 1:
+            columns = [(column, not descending)]
+        else:
+            columns = [(column, False)]
+        self._sort_columns = columns
         
-        # Update column header
-        arrow = "↓" if self._sort_reverse[column] else "↑"
+        # Sort the whole filtered list in the data layer, not the Treeview
+        ids = [int(iid) for iid in self.task_list.rows]
+        ids = self.store.sort_ids(ids, self.sort_fields())
+        self.task_list.set_rows([str(task_id) for task_id in ids])
         
+        # Update column headers: arrow per sort column, numbered if several
         for col in self.tree["columns"]:
             # Remove existing arrows from all headers
-            text = self.tree.heading(col)["text"].rstrip(" ↑↓")
-            # Add arrow to current sort column
-            self.tree.heading(col, text=f"{text}{' ' + arrow if col == column else ''}")
-
-    def complete_task(self, task, reminder_window=None):
-        """Mark a task as completed and close its reminder window"""
-        task['status'] = 'Completed'
-        if task['id'] in self.active_reminders:
-            del self.active_reminders[task['id']]
-        
-        # Close reminder window if provided
-        if reminder_window:
-            reminder_window.destroy()
-        
-        # Save and refresh
-        self.save_tasks()
-        self.refresh_task_list()
-        self.status_bar.config(text=f"Task '{task['name']}' marked as completed")
-        
-        # Show completion notification
-        if self.settings.get('notification_enabled', True):
-            try:
-                notification.notify(
-                    title=f"{self.app_name} - Task Completed",  # Updated title
-                    message=f"Task '{task['name']}' has been completed!",
-                    app_icon=self.icon_path,
-                    app_name=self.app_name,  # Add app name
-                    timeout=5
-                )
-            except Exception as e:
-                print(f"Failed to show completion notification: {e}")
+            text = self.tree.heading(col)["text"].rstrip(" ↑↓0123456789")
+            for position, (sort_col, descending) in enumerate(columns, 1):
+                if sort_col == col:
+                    arrow = "↓" if descending else "↑"
+                    text += f" {arrow}{position if len(columns) > 1 else ''}"
+            self.tree.heading(col, text=text)
+
+    def sort_fields(self):
+        """The main list sort as TaskStore.sort_ids columns"""
+        return [(self.SORT_FIELDS[column], descending) for column, descending in self._sort_columns]
+
+    def on_heading_shift_click(self, event):
+        """Shift+click on a column header adds it as another sort key"""
+        if self.tree.identify_region(event.x, event.y) != "heading":
+            return None
+        column_number = int(self.tree.identify_column(event.x).lstrip('#'))
+        self.sort_tasks(self.tree["columns"][column_number - 1], add=True)
+        return "break"
 
     def clear_details_panel(self):
         """Clear all fields in the details panel for new task"""
@@ -1820,8 +2688,7 @@ Notes: {task.get('notes', '')}
         self.notes_text.delete('1.0', tk.END)
         
         # Clear tree selection
-        if self.tree.selection():
-            self.tree.selection_remove(self.tree.selection())
+        self.task_list.clear_selection()
         
         self.status_bar.config(text="Ready to add new task")
         
@@ -1860,7 +2727,7 @@ Notes: {task.get('notes', '')}
         date_frame = ttk.LabelFrame(single_frame, text="Reminder Date")
         date_frame.pack(fill=tk.X, pady=5)
         
-        cal = Calendar(date_frame, selectmode='day',
+        cal = calendar_widget(date_frame, selectmode='day',
                       year=datetime.now().year,
                       month=datetime.now().month,
                       day=datetime.now().day)
@@ -1925,12 +2792,12 @@ Notes: {task.get('notes', '')}
             else:
                 # Get due date from task or current selection
                 task = None
-                selected_items = self.tree.selection()
+                selected_items = self.task_list.selection()
                 if selected_items:
                     task = self.get_task_by_id(selected_items[0])
                 
-                if task:
-                    due_date = datetime.strptime(task['due_date'], "%Y-%m-%d %H:%M")
+                due_date = self.store.due(task) if task else None
+                if due_date is not None:
                     for i, var in enumerate(days_vars):
                         if var.get():
                             reminder_date = due_date - timedelta(days=i+1)
@@ -1946,16 +2813,16 @@ Notes: {task.get('notes', '')}
             }
             
             # Update task
-            selected_items = self.tree.selection()
+            selected_items = self.task_list.selection()
             if selected_items:
                 task = self.get_task_by_id(selected_items[0])
                 if task:
-                    task.update({
+                    self.store.update(task['id'], {
                         'reminder_enabled': True,
                         'reminder_time': 'custom',
                         'custom_reminder': custom_reminder
                     })
-                    self.save_tasks()
+                    self.request_save()
             
             dialog.destroy()
             messagebox.showinfo("Success", 
@@ -1984,7 +2851,7 @@ Notes: {task.get('notes', '')}
         if not selected_reminder:
             return
             
-        selected_task = self.tree.selection()
+        selected_task = self.task_list.selection()
         if not selected_task:
             return
             
@@ -1994,18 +2861,22 @@ Notes: {task.get('notes', '')}
             reminder_datetime = f"{reminder_date[0]} {reminder_date[1]}"
             
             # Remove from times list
-            task['custom_reminder']['times'] = [
+            remaining = [
                 t for t in task['custom_reminder']['times'] 
                 if t != reminder_datetime
             ]
             
             # If no reminders left, disable reminders for task
-            if not task['custom_reminder']['times']:
-                task['reminder_enabled'] = False
-                task['reminder_time'] = ''
-                del task['custom_reminder']
+            if remaining:
+                custom_reminder = dict(task['custom_reminder'], times=remaining)
+                self.store.update(task['id'], {'custom_reminder': custom_reminder})
+            else:
+                self.store.update(task['id'], {
+                    'reminder_enabled': False,
+                    'reminder_time': ''
+                }, drop=('custom_reminder',))
             
-            self.save_tasks()
+            self.request_save()
             self.update_reminder_list(task)
             messagebox.showinfo("Success", "Reminder deleted successfully")
 
@@ -2023,9 +2894,9 @@ Notes: {task.get('notes', '')}
             for reminder_time in task['custom_reminder']['times']:
                 date, time = reminder_time.split(' ')
                 self.reminder_list.insert("", "end", values=(date, time))
-        elif task.get('reminder_enabled'):
+        elif task.get('reminder_enabled') and self.store.due(task) is not None:
             # Show standard reminder if enabled
-            due_date = datetime.strptime(task['due_date'], "%Y-%m-%d %H:%M")
+            due_date = self.store.due(task)
             self.reminder_list.insert("", "end", 
                                     values=(due_date.strftime("%Y-%m-%d"),
                                           due_date.strftime("%H:%M")))
@@ -2036,15 +2907,16 @@ Notes: {task.get('notes', '')}
         if not hasattr(self, 'tray_icon'):
             try:
                 from pystray import Icon, Menu, MenuItem
-                import PIL.Image
+                import PIL.Image  # Only the tray icon needs PIL
                 
                 # Load icon
                 image = PIL.Image.open(self.icon_path)
                 
                 # Create menu
                 menu = Menu(
-                    MenuItem("Show", self.show_window),
-                    MenuItem("Exit", self.quit_app)
+                    # pystray calls these on its own thread; hand them to Tk
+                    MenuItem("Show", lambda: self.root.after(0, self.show_window)),
+                    MenuItem("Exit", lambda: self.root.after(0, self.quit_app))
                 )
                 
                 # Create tray icon
@@ -2054,12 +2926,23 @@ Notes: {task.get('notes', '')}
                 threading.Thread(target=self.tray_icon.run, daemon=True).start()
             except Exception as e:
                 print(f"Failed to create system tray icon: {e}")
+                if self.background:
+                    # Without a tray icon the app could never be opened
+                    self.show_window()
+                    self.root.iconify()
 
     def show_window(self):
-        """Show and restore window"""
+        """Show and restore window, building it first in tray-only mode"""
+        if not self.ui_built:
+            self.build_ui()
+            self.update_today_tasks()
+            self.refresh_task_list()
+            if self.reminder_inbox:
+                self.show_reminder_center()
         self.root.deiconify()
         self.root.lift()
         self.root.focus_force()
+        self.views.flush()
 
     def quit_app(self):
         """Clean exit application"""
@@ -2068,6 +2951,12 @@ Notes: {task.get('notes', '')}
                 self.tray_icon.stop()
         except:
             pass
+        # Flush pending changes before the worker thread goes away
+        self.save_tasks()
+        self.saver.close()
+        self.storage.close()
+        self.alerts.close()
+        self.audio.close()
         self.root.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+"""Streaming import: validation errors, malformed input, duplicates and id remapping."""
+import json
+
+import pytest
+
+import task_io
+from task_io import export_tasks, load_import, normalize_task
+from task_store import TaskStore
+
+
+def task(number, **fields):
+    record = {'id': number, 'name': f"Task {number}", 'due_date': "2024-03-01 09:00"}
+    record.update(fields)
+    return record
+
+
+def test_json_import_reports_bad_records_and_keeps_reading(tmp_path, monkeypatch):
+    # Tiny reads split every element across chunks
+    monkeypatch.setattr(task_io, 'CHUNK_SIZE', 7)
+    path = tmp_path / 'import.json'
+    path.write_text(
+        '[' + json.dumps(task(1)) + ', {"name": "broken", "due_date": nope}, '
+        + json.dumps(task(2, name="")) + ', "text", '
+        + json.dumps(task(3, due_date="tomorrow")) + ', ' + json.dumps(task(4)) + ']'
+    )
+    result = load_import(str(path), [])
+    assert [record['name'] for record in result['tasks']] == ["Task 1", "Task 4"]
+    assert [where for where, _ in result['errors']] == ["item 1", "item 2", "item 3", "item 4"]
+    messages = [message for _, message in result['errors']]
+    assert messages[0].startswith("invalid data")
+    assert messages[1:] == ["missing task name", "expected an object", "invalid due date 'tomorrow'"]
+
+
+def test_json_import_rejects_a_non_array(tmp_path):
+    path = tmp_path / 'import.json'
+    path.write_text(json.dumps(task(1)))
+    with pytest.raises(ValueError):
+        load_import(str(path), [], fmt='json')
+
+
+def test_json_import_rejects_a_truncated_file(tmp_path):
+    path = tmp_path / 'import.json'
+    path.write_text('[' + json.dumps(task(1)) + ', {"name": "cut')
+    with pytest.raises(ValueError):
+        load_import(str(path), [])
+
+
+def test_ndjson_and_csv_errors_name_their_line(tmp_path):
+    ndjson = tmp_path / 'import.ndjson'
+    ndjson.write_text(json.dumps(task(1)) + '\n{oops\n\n' + json.dumps(task(2, due_date="")) + '\n')
+    result = load_import(str(ndjson), [])
+    assert len(result['tasks']) == 1
+    assert [where for where, _ in result['errors']] == ["line 2", "line 4"]
+
+    csv_path = tmp_path / 'import.csv'
+    export_tasks(str(csv_path), [normalize_task(task(1)), normalize_task(task(2))])
+    with open(csv_path, 'a') as f:
+        f.write('3,No due date,,Pending,Work,Normal,,,,,\n')
+    result = load_import(str(csv_path), [])
+    assert [record['id'] for record in result['tasks']] == [1, 2]
+    assert result['errors'] == [("line 4", "invalid due date None")]
+
+
+def test_duplicates_are_matched_by_content(tmp_path):
+    existing = [normalize_task(task(n)) for n in (1, 2, 3)]
+    path = tmp_path / 'import.ndjson'
+    records = [task(1), task(7, name="Task 2"), task(9, name="New"), task(10, name="New")]
+    path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+    result = load_import(str(path), existing)
+    assert result['duplicates'] == 3
+    assert [record['id'] for record in result['tasks']] == [9]
+
+
+def test_colliding_ids_are_remapped_in_one_pass(tmp_path):
+    store = TaskStore([normalize_task(task(n)) for n in (1, 2, 3)])
+    path = tmp_path / 'import.json'
+    path.write_text(json.dumps([task(n, name=f"Imported {n}") for n in range(1, 6)]))
+    result = load_import(str(path), store.snapshot())
+    assert len(result['tasks']) == 5 and not result['errors']
+
+    assert store.add_many(result['tasks']) == 3
+    assert len(store) == 8
+    assert store.get(4)['name'] == "Imported 4"
+    assert sorted(store.get(n)['name'] for n in (6, 7, 8)) == [
+        "Imported 1", "Imported 2", "Imported 3",
+    ]
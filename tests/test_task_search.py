@@ -0,0 +1,58 @@
+"""SearchIndex: bulk building, incremental updates and narrowing."""
+import random
+
+from task_search import SearchIndex
+
+
+WORDS = ["meeting", "meet", "review", "reviewer", "report", "budget", "plan", "call"]
+
+
+def make_tasks(count, seed=5):
+    random.seed(seed)
+    return [
+        {
+            'id': number,
+            'name': " ".join(random.choice(WORDS) for _ in range(3)),
+            'category': random.choice(["Work", "Home"]),
+            'notes': " ".join(random.choice(WORDS) for _ in range(2)),
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+def test_build_matches_incremental_adds():
+    tasks = make_tasks(500)
+    built = SearchIndex()
+    built.build(tasks)
+    added = SearchIndex()
+    for task in tasks:
+        added.add(task)
+    assert built._vocabulary == added._vocabulary
+    assert built._postings == added._postings
+
+    for task in tasks[:50]:
+        built.remove(task['id'])
+        added.remove(task['id'])
+    built.add({'id': 1000, 'name': "zebra crossing"})
+    added.add({'id': 1000, 'name': "zebra crossing"})
+    assert built._vocabulary == added._vocabulary
+    assert built.search("zeb") == [1000]
+
+
+def test_narrowing_matches_a_fresh_search():
+    index = SearchIndex()
+    index.build(make_tasks(2000))
+    query = "meeting revi"
+    previous = None
+    for length in range(1, len(query) + 1):
+        typed = query[:length]
+        fresh = index.search(typed)
+        if previous is not None:
+            assert index.narrow(typed, previous) == fresh
+        previous = fresh
+    assert index.narrow("", previous) == []
+    # Small candidate sets look ids up in the posting lists
+    candidates = previous[:5]
+    assert index.narrow("meet", candidates) == [
+        task_id for task_id in index.search("meet") if task_id in candidates
+    ]
@@ -0,0 +1,206 @@
+"""Storage backends: journal replay and recovery, migration, compaction and saving."""
+import json
+import time
+from datetime import date
+
+import pytest
+
+from task_storage import (
+    BackgroundSaver, BinarySnapshotStorage, JournalStorage, JsonStorage, SQLiteStorage,
+    StorageError,
+)
+from task_store import TaskStore, due_bounds, due_range
+
+
+def write_json(path, tasks):
+    with open(path, 'w') as f:
+        json.dump(tasks, f)
+
+
+def test_journal_keeps_repeated_ids_for_the_store_to_remap(tmp_path):
+    path = tmp_path / 'tasks.json'
+    write_json(path, [{'id': 1, 'name': 'a'}, {'id': 1, 'name': 'b'}, {'id': 2, 'name': 'c'}])
+    storage = JournalStorage(str(path))
+    storage.record('updated', {'id': 1, 'name': 'A'})
+    storage.record('removed', {'id': 2})
+    storage.record('added', {'id': 3, 'name': 'd'})
+    storage.close()
+
+    tasks = JournalStorage(str(path)).load()
+    assert [task['name'] for task in tasks] == ['A', 'b', 'd']
+    store = TaskStore()
+    assert store.load(tasks) == 1
+    assert sorted(store.matching()) == [1, 3, 4]
+
+
+def test_journal_truncates_a_torn_tail(tmp_path):
+    path = tmp_path / 'tasks.json'
+    storage = JournalStorage(str(path))
+    storage.record('added', {'id': 1, 'name': 'kept'})
+    storage.record('added', {'id': 2, 'name': 'kept too'})
+    storage.close()
+    journal = tmp_path / 'tasks.json.journal'
+    good_size = journal.stat().st_size
+    with open(journal, 'ab') as f:
+        f.write(JournalStorage._encode({'op': 'put', 'task': {'id': 3, 'name': 'torn'}})[:-9])
+
+    storage = JournalStorage(str(path))
+    assert [task['id'] for task in storage.load()] == [1, 2]
+    assert storage.recovered_tail
+    assert journal.stat().st_size == good_size
+
+    # New records start on a clean line after the truncation
+    storage.record('added', {'id': 3, 'name': 'new'})
+    storage.close()
+    assert [task['name'] for task in JournalStorage(str(path)).load()] == ['kept', 'kept too', 'new']
+
+
+def test_journal_stops_at_a_bad_checksum(tmp_path):
+    path = tmp_path / 'tasks.json'
+    storage = JournalStorage(str(path))
+    storage.record('added', {'id': 1, 'name': 'kept'})
+    storage.close()
+    journal = tmp_path / 'tasks.json.journal'
+    line = JournalStorage._encode({'op': 'put', 'task': {'id': 2, 'name': 'bad'}})
+    with open(journal, 'ab') as f:
+        f.write(b'00000000' + line[8:])
+        f.write(JournalStorage._encode({'op': 'put', 'task': {'id': 3, 'name': 'after'}}))
+
+    assert [task['id'] for task in JournalStorage(str(path)).load()] == [1]
+
+
+def test_sqlite_migration_remaps_repeated_ids(tmp_path):
+    json_path = tmp_path / 'tasks.json'
+    write_json(json_path, [
+        {'id': 1, 'name': 'a'}, {'id': 1, 'name': 'b'}, {'name': 'c'},
+    ])
+    storage = SQLiteStorage(str(tmp_path / 'tasks.db'), str(json_path))
+    tasks = storage.load()
+    storage.close()
+    assert [(task['id'], task['name']) for task in tasks] == [(1, 'a'), (2, 'b'), (3, 'c')]
+
+    # The migration is flagged done and not repeated
+    write_json(json_path, [{'id': 9, 'name': 'later'}])
+    storage = SQLiteStorage(str(tmp_path / 'tasks.db'), str(json_path))
+    assert [task['name'] for task in storage.load()] == ['a', 'b', 'c']
+    storage.close()
+
+
+def test_sqlite_migration_is_retried_after_a_failure(tmp_path):
+    json_path = tmp_path / 'tasks.json'
+    json_path.write_text('[{"id": 1, "name": "a"}, ')  # Unreadable
+    db_path = str(tmp_path / 'tasks.db')
+    storage = SQLiteStorage(db_path, str(json_path))
+    with pytest.raises(StorageError):
+        storage.load()
+    storage.record('added', {'id': 1, 'name': 'added after the failure'})
+    storage.close()
+
+    write_json(json_path, [{'id': 1, 'name': 'a'}])
+    storage = SQLiteStorage(db_path, str(json_path))
+    assert [task['name'] for task in storage.load()] == ['a', 'added after the failure']
+    storage.close()
+
+
+def test_sqlite_due_queries_agree_with_the_store(tmp_path):
+    tasks = [
+        {'id': 1, 'name': 'unpadded', 'due_date': '2024-1-5 9:00'},
+        {'id': 2, 'name': 'padded', 'due_date': '2024-01-05 23:59'},
+        {'id': 3, 'name': 'next day', 'due_date': '2024-01-06 00:00'},
+        {'id': 4, 'name': 'malformed', 'due_date': 'soon'},
+    ]
+    storage = SQLiteStorage(str(tmp_path / 'tasks.db'), str(tmp_path / 'tasks.json'))
+    for task in tasks:
+        storage.record('added', task)
+    store = TaskStore(tasks)
+    today = date(2024, 1, 5)
+    for period in ("Today", "This Week", "This Month"):
+        due_from, due_to = due_range(period, today)
+        expected = sorted(store.due_ids_between(*due_bounds(period, today)))
+        assert storage.query(due_from=due_from, due_to=due_to) == expected
+    storage.close()
+
+
+def lazy_store(tmp_path, count=90):
+    json_path = tmp_path / 'tasks.json'
+    write_json(json_path, [
+        {'id': n, 'name': f"Task {n}", 'due_date': f"2024-02-{n % 28 + 1:02d} 10:00",
+         'status': 'Completed' if n % 3 else 'Pending'}
+        for n in range(1, count + 1)
+    ])
+    storage = BinarySnapshotStorage(str(tmp_path / 'tasks.snap'), str(json_path))
+    store = TaskStore()
+    store.load_snapshot(*storage.open_snapshot())
+    store.subscribe(storage.record)
+    return storage, store
+
+
+def test_binary_compaction_keeps_tasks_lazy(tmp_path):
+    storage, store = lazy_store(tmp_path)
+    lazy = len(store._rows)
+    assert lazy == 60
+    store.update(1, {'name': 'changed'})  # Completed, so it is decoded now
+    store.add({'name': 'new'})
+    store.remove(2)  # Completed, still lazy
+    assert storage.needs_compact() and not storage.save_needs_tasks()
+
+    storage.compact_store(store)
+    assert len(store._rows) == lazy - 2
+    assert storage.journal_records == 0
+    assert store.get(4)['name'] == "Task 4"
+    expected = sorted(store.snapshot(), key=lambda task: task['id'])
+    storage.close()
+
+    reopened = TaskStore()
+    reopened.load_snapshot(*BinarySnapshotStorage(
+        str(tmp_path / 'tasks.snap'), str(tmp_path / 'tasks.json')).open_snapshot())
+    assert sorted(reopened.snapshot(), key=lambda task: task['id']) == expected
+
+
+class SlowStorage(JsonStorage):
+    def __init__(self, path, delay):
+        super().__init__(path)
+        self.delay = delay
+
+    def save(self, tasks):
+        time.sleep(self.delay)
+        super().save(tasks)
+
+
+def test_saver_flush_orders_writes_before_a_compact(tmp_path):
+    path = tmp_path / 'tasks.json'
+    storage = SlowStorage(str(path), 0.1)
+    saver = BackgroundSaver(storage)
+    saver.submit(1, [{'id': 1}])
+    saver.submit(2, [{'id': 2}])
+    saver.flush()
+    storage.compact([{'id': 'restored'}], force=True)
+    saver.mark_saved(10)
+    saver.close()
+    assert json.loads(path.read_text()) == [{'id': 'restored'}]
+    assert saver.saved_version == 10
+    assert not saver.busy()
+
+
+def test_saver_retries_a_failed_version(tmp_path):
+    class FailingStorage(JsonStorage):
+        fail = True
+
+        def save(self, tasks):
+            if self.fail:
+                raise OSError("disk full")
+            super().save(tasks)
+
+    storage = FailingStorage(str(tmp_path / 'tasks.json'))
+    saver = BackgroundSaver(storage)
+    saver.submit(1, [{'id': 1}])
+    version, _, error = saver.results.get(timeout=5)
+    assert (version, str(error)) == (1, "disk full")
+    saver.failed(version)
+    assert saver.is_dirty(1)
+
+    storage.fail = False
+    saver.submit(1, [{'id': 1}])
+    assert saver.results.get(timeout=5)[2] is None
+    assert not saver.is_dirty(1) and not saver.busy()
+    saver.close()
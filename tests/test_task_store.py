@@ -0,0 +1,137 @@
+"""Invariants of TaskStore: ids, facet sets, the due index and sorting."""
+import random
+from datetime import datetime, timedelta
+
+from task_store import FACETS, TaskStore, parse_due
+
+
+def make_task(number, **fields):
+    task = {
+        'name': f"Task {number}",
+        'due_date': (datetime(2024, 1, 1) + timedelta(hours=number)).strftime("%Y-%m-%d %H:%M"),
+        'category': ('Work', 'Personal', 'Other')[number % 3],
+        'priority': ('Low', 'Normal', 'High')[number % 3],
+        'status': 'Completed' if number % 4 == 0 else 'Pending',
+    }
+    task.update(fields)
+    return task
+
+
+def check_indexes(store):
+    """Compare every index the store keeps with a scan of its tasks"""
+    tasks = store.all()
+    assert len({task['id'] for task in tasks}) == len(tasks) == len(store)
+    assert all(task['id'] < store.next_task_id for task in tasks)
+
+    for field, default in FACETS.items():
+        expected = {}
+        for task in tasks:
+            value = task.get(field, default)
+            expected[value] = expected.get(value, 0) + 1
+        assert store.facet_counts(field) == expected
+        for value in expected:
+            assert store.matching(**{field: value}) == {
+                task['id'] for task in tasks if task.get(field, default) == value
+            }
+
+    start, end = datetime(2024, 1, 2), datetime(2024, 1, 5)
+    expected = sorted(
+        (parse_due(task['due_date']), task['id']) for task in tasks
+        if parse_due(task.get('due_date')) is not None
+        and start <= parse_due(task['due_date']) < end
+    )
+    assert store.due_ids_between(start, end) == [task_id for _, task_id in expected]
+
+
+def test_load_keeps_ids_and_remaps_duplicates():
+    tasks = [make_task(1, id=1), make_task(2, id=1), make_task(3, id=5), make_task(4)]
+    store = TaskStore()
+    assert store.load(tasks) == 2
+    assert sorted(store.matching()) == [1, 5, 6, 7]
+    assert [task['name'] for task in store.all()] == ["Task 1", "Task 3", "Task 2", "Task 4"]
+    assert store.add(make_task(5))['id'] == 8
+
+
+def test_add_many_remaps_only_taken_ids():
+    store = TaskStore([make_task(n, id=n) for n in (1, 2, 3)])
+    imported = [make_task(10 + n, id=n) for n in range(1, 6)]
+    assert store.add_many(imported) == 3
+    assert sorted(store.matching()) == list(range(1, 9))
+    # Ids 4 and 5 were free, so those tasks kept them
+    assert store.get(4)['name'] == "Task 14"
+    assert store.get(5)['name'] == "Task 15"
+    check_indexes(store)
+
+
+def test_indexes_follow_mutations():
+    random.seed(7)
+    store = TaskStore([make_task(n) for n in range(200)])
+    check_indexes(store)  # Builds the facet sets and the due index
+    for step in range(300):
+        ids = sorted(store.matching())
+        action = random.random()
+        if action < 0.3:
+            store.add(make_task(1000 + step))
+        elif action < 0.5 and ids:
+            store.remove(random.choice(ids))
+        elif ids:
+            store.update(random.choice(ids), {
+                'status': random.choice(['Pending', 'Completed']),
+                'category': random.choice(['Work', 'Home']),
+                'due_date': make_task(random.randrange(100))['due_date'],
+            })
+    check_indexes(store)
+
+
+def test_malformed_due_dates_are_not_indexed():
+    store = TaskStore([make_task(1, due_date="soon"), make_task(2, due_date="2024-1-1 2:00")])
+    assert store.due_ids_between(datetime(2000, 1, 1), datetime(2100, 1, 1)) == [2]
+
+
+def sorted_by(store, ids, columns):
+    """Reference sort: stable sorts from the least significant column"""
+    ids = list(ids)
+    for field, descending in reversed(columns):
+        ids.sort(key=lambda task_id: store._sort_key(field, task_id), reverse=descending)
+    return ids
+
+
+def test_sort_cache_matches_a_fresh_sort():
+    random.seed(3)
+    store = TaskStore([make_task(n, name=random.choice("abc")) for n in range(300)])
+    ids = sorted(store.matching())
+    columns = [('priority', False), ('name', False)]
+    for descending in (False, True, False, True):
+        columns[0] = ('priority', descending)
+        assert store.sort_ids(ids, columns) == sorted_by(store, ids, columns)
+
+    store.update(ids[0], {'priority': 'Urgent', 'name': 'zzz'})
+    assert store.sort_ids(ids, columns) == sorted_by(store, ids, columns)
+
+    store.remove(ids[1])
+    assert store.sort_ids(ids, columns) == sorted_by(store, ids[:1] + ids[2:], columns)
+
+
+def test_100k_tasks_with_the_same_name():
+    count = 100000
+    store = TaskStore([
+        {'id': count - n, 'name': "Standup", 'due_date': "2024-05-01 09:00"}
+        for n in range(count)
+    ])
+    assert len(store) == count
+    ids = list(store.matching())
+
+    # Every key ties, so both directions keep the input order
+    assert store.sort_ids(ids, [('name', False)]) == ids
+    assert store.sort_ids(ids, [('name', True)]) == ids
+    assert store.sort_ids(ids, [('due', True), ('name', False)]) == ids
+
+    assert store.facet_counts('status') == {'Pending': count}
+    assert len(store.due_ids_between(datetime(2024, 5, 1), datetime(2024, 5, 2))) == count
+    # Equal scores rank by id
+    assert store.search("stand") == sorted(ids)
+
+    store.update(ids[10], {'name': "Retro"})
+    assert store.sort_ids(ids, [('name', False)]) == [ids[10]] + ids[:10] + ids[11:]
+    assert store.search("standup retro") == []
+    assert store.search("retro") == [ids[10]]